@@ -1,24 +1,63 @@
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_login import LoginManager
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from dotenv import load_dotenv
 import os
+import orjson
 
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson (C encoder) for jsonify and request.get_json.
+
+    Values orjson can't encode natively (dates, Decimal, UUID, ...) go through
+    Flask's default handler, so the output matches the stdlib provider.
+    """
+    def _options(self):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options())
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 # Setup of key Flask object (app)
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configure Flask Port, default to 8587 which is same as Docker setup
 app.config['FLASK_PORT'] = int(os.environ.get('FLASK_PORT') or 8587)
 
 # Configure Flask to handle JSON with UTF-8 encoding versus default ASCII
 app.config['JSON_AS_ASCII'] = False  # Allow emojis, non-ASCII characters in JSON responses
+# Compact, unsorted JSON even when debugging: no pretty-print whitespace, no per-response key sort
+app.json.compact = True
+app.json.sort_keys = False
+
+# Debug mode (reloader, interactive debugger) is opt-in, e.g. FLASK_DEBUG=1 for local development
+app.config['FLASK_DEBUG'] = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
 
 
 # Initialize Flask-Login object
@@ -80,6 +119,13 @@ if DB_ENDPOINT and DB_USERNAME and DB_PASSWORD:
    dbString = f'mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_ENDPOINT}:{DB_PORT}'
    dbURI =  dbString + '/' + dbName
    backupURI = None  # MySQL backup would require a different approach
+   # Keep warm connections across requests; pre-ping/recycle drop ones the server closed
+   app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+       'pool_size': 10,
+       'max_overflow': 20,
+       'pool_pre_ping': True,
+       'pool_recycle': 1800,
+   }
 else:
    # Development - Use SQLite
    dbString = 'sqlite:///volumes/'
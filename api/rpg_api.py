@@ -1,11 +1,24 @@
 # RPG Game Login Backend API
-from flask import Blueprint, jsonify, request, current_app
-from flask_cors import CORS
+from flask import Blueprint, jsonify, request, current_app, stream_with_context
 from contextlib import contextmanager
 from flask_restful import Api, Resource
+from werkzeug.http import HTTP_STATUS_CODES
 import sqlite3
 import os
+import json
+import traceback
+import queue
+import threading
+import atexit
+import functools
+import hashlib
+import time
+import uuid
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict, deque
 from model.rpg_user import RPGUser
 from model.user import User
 from api.rpg_stories import *
@@ -25,26 +38,72 @@ _extra_origins_env = os.getenv("FRONTEND_ORIGINS", "")
 _extra_origins = [o.strip() for o in _extra_origins_env.split(",") if o.strip()]
 _allowed_origins = _base_origins + _extra_origins
 
-CORS(
-    rpg_api,
-    supports_credentials=True,
-    methods=["GET", "POST", "PUT", "OPTIONS"],
-    allow_headers=["Content-Type", "X-Origin"],
-    resources={
-        r"/api/*": {
-            "origins": _allowed_origins
-        }
-    }
-)
+_allowed_origin_set = frozenset(_allowed_origins)
+
+# CORS headers are fixed, so they're set straight from these dicts instead of
+# going through flask_cors' per-request option matching. Responses that already
+# carry Access-Control-Allow-Origin are left alone by the app-wide CORS hook.
+_CORS_HEADERS = {
+    'Access-Control-Allow-Credentials': 'true',
+}
+_CORS_PREFLIGHT_HEADERS = {
+    **_CORS_HEADERS,
+    'Access-Control-Allow-Methods': 'GET, OPTIONS, POST, PUT',
+    'Access-Control-Allow-Headers': 'Content-Type, X-Origin',
+}
+
+def _cors_origin():
+    """Request origin if it may call the RPG API, else None"""
+    origin = request.headers.get('Origin')
+    if origin in _allowed_origin_set and request.path.startswith('/api/'):
+        return origin
+    return None
+
+@rpg_api.before_request
+def _cors_preflight():
+    # Answer preflights here, before the view or flask_restful gets involved
+    if request.method != 'OPTIONS':
+        return None
+    origin = _cors_origin()
+    if origin is None:
+        return None
+    response = current_app.response_class(status=204)
+    response.headers.update(_CORS_PREFLIGHT_HEADERS)
+    response.headers['Access-Control-Allow-Origin'] = origin
+    response.vary.add('Origin')
+    return response
+
+@rpg_api.after_request
+def _cors_headers(response):
+    origin = _cors_origin()
+    if origin is not None and 'Access-Control-Allow-Origin' not in response.headers:
+        response.headers.update(_CORS_HEADERS)
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.vary.add('Origin')
+    return response
+
 api = Api(rpg_api)
+
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """Encode Resource return values with the app's JSON provider (orjson) instead of stdlib json"""
+    response = current_app.json.response(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
+
 #
 # Route groups and their frontend targets:
 # - `/api/rpg/data`         : RPG user list + registration  (game UI / admin)
 # - `/api/rpg/login`        : Login for RPG users              (game UI)
 # - `/api/rpg/character`    : Create character sheet           (game UI)
+# - `/api/rpg/character/batch`: Create several character sheets at once (party creation)
+# - `/api/rpg/character/analysis/<id>`: Poll a background analysis (`?async=1` creation)
 # - `/api/rpg/quest(s)`     : Create / list quests             (game UI)
 # - `/api/rpg/keybindings`  : Save / load key bindings         (game UI)
 # - `/api/rpg/story`        : Story element browsing (used by in-game story UI)
+# - `/api/rpg/story/votes`  : Several love/skip votes in one request (story UI)
+# - `/api/rpg/batch`        : Several GETs above in one round trip (game UI load)
 # - `/api/rpg_stats/*`      : RPC endpoints for aggregated stats (admin & client)
 # - `/api/stats/*`          : Legacy endpoints (kept for backward compatibility)
 # ---------------------------------------------------------------------------
@@ -56,16 +115,17 @@ def get_rpg_db_path(app=None):
       <instance>/rpg/rpg.db
     This keeps the path consistent across import-time and request-time.
     """
-    import os
-    from flask import current_app
-
     if app is None:
         try:
             app = current_app._get_current_object()
-        except Exception:
+        except RuntimeError:
+            # Outside an application context
             app = None
 
     if app is not None:
+        # Resolved once when the blueprint is registered
+        if 'RPG_DB_PATH' in app.config:
+            return app.config['RPG_DB_PATH']
         base = app.instance_path
     else:
         # Fallback only if called outside Flask (rare)
@@ -74,164 +134,352 @@ def get_rpg_db_path(app=None):
     return os.path.join(base, "rpg", "rpg.db")
 
 
+# --- SQLite connection helpers ---
+def _is_file_db(path):
+    """PRAGMA tuning only applies to on-disk databases, not `:memory:`"""
+    return path != ':memory:' and not path.startswith('file::memory:')
+
+def _apply_pragmas(conn, path):
+    """Per-connection tuning (journal_mode=WAL is persistent and set once by the init functions)"""
+    if not _is_file_db(path):
+        return
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA cache_size=-20000')
+
+
+class SQLitePool:
+    """Process-wide pool of SQLite connections for one database file.
+
+    Connections are opened lazily (up to `size`), tuned once, and reused across
+    requests instead of being opened and closed every time. Writers are
+    serialized on a lock so concurrent requests don't hit `database is locked`.
+    """
+    def __init__(self, path, size=None):
+        self.path = path
+        self.size = size or min(32, (os.cpu_count() or 1) * 2)
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _connect(self):
+        # Long-lived connections keep their compiled statements; leave room for all of them.
+        # isolation_level=None: no implicit (deferred) BEGIN before DML. Reads run as
+        # plain autocommit snapshots and every write opens its own BEGIN IMMEDIATE,
+        # so a transaction never has to upgrade from a read lock to a write lock.
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256, isolation_level=None)
+        _apply_pragmas(conn, self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._open_lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if not can_open:
+            return self._idle.get()
+        try:
+            return self._connect()
+        except Exception:
+            with self._open_lock:
+                self._opened -= 1
+            raise
+
+    def _release(self, conn):
+        # Never hand out a connection with a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    # Readers share the pool freely; in WAL mode they never wait on the writer
+    reader = connection
+
+    @contextmanager
+    def writer(self):
+        with self._write_lock:
+            with self.connection() as conn:
+                yield conn
+
+    @contextmanager
+    def transaction(self):
+        """Writer connection inside BEGIN IMMEDIATE; commits on success, rolls back on error"""
+        with self.writer() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+
+# One pool per rpg.db path (the path depends on the app's instance folder)
+_rpg_pools = {}
+_rpg_pools_lock = threading.Lock()
+
+def get_rpg_pool(app=None):
+    """Shared connection pool for the RPG database"""
+    if app is None:
+        try:
+            app = current_app._get_current_object()
+        except RuntimeError:
+            app = None
+    # Registered apps keep their pool in app.extensions, so requests skip the path lookup
+    if app is not None and 'rpg_pool' in app.extensions:
+        return app.extensions['rpg_pool']
+
+    path = get_rpg_db_path(app=app)
+    pool = _rpg_pools.get(path)
+    if pool is None:
+        with _rpg_pools_lock:
+            pool = _rpg_pools.setdefault(path, SQLitePool(path))
+    return pool
+
+
+# Schema setup runs once per database file per process, however often it is requested
+_init_lock = threading.Lock()
+_initialized_dbs = set()
+
+def _claim_init(path):
+    """True for the first caller for `path`; everyone after that skips initialization"""
+    with _init_lock:
+        if path in _initialized_dbs:
+            return False
+        _initialized_dbs.add(path)
+        return True
+
+
 # Initialize RPG database with all tables
 def init_rpg_db(app=None):
     """Initialize SQLite database for RPG game with character sheets and quests tables"""
     db_path = get_rpg_db_path(app=app)
+    if not _claim_init(db_path):
+        return
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    with get_rpg_pool(app).writer() as conn:
+        # WAL lets the request handlers read while a write is in progress
+        if _is_file_db(db_path):
+            conn.execute('PRAGMA journal_mode=WAL')
 
-    
-    # Create character_sheets table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS character_sheets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_github_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            motivation TEXT NOT NULL,
-            fear TEXT NOT NULL,
-            secret TEXT NOT NULL,
-            game_mode TEXT NOT NULL,
-            analysis TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+        cursor = conn.cursor()
+        # Schema and migrations in one write transaction
+        cursor.execute('BEGIN IMMEDIATE')
 
-    # Safe migration: add appearance_json if missing
-    cursor.execute("PRAGMA table_info(character_sheets)")
-    _char_cols = [row[1] for row in cursor.fetchall()]
-    if 'appearance_json' not in _char_cols:
-        try:
-            cursor.execute('ALTER TABLE character_sheets ADD COLUMN appearance_json TEXT')
-        except Exception:
-            pass
+        # Create character_sheets table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS character_sheets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_github_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                motivation TEXT NOT NULL,
+                fear TEXT NOT NULL,
+                secret TEXT NOT NULL,
+                game_mode TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Safe migration: add appearance_json if missing
+        cursor.execute("PRAGMA table_info(character_sheets)")
+        _char_cols = [row[1] for row in cursor.fetchall()]
+        if 'appearance_json' not in _char_cols:
+            try:
+                cursor.execute('ALTER TABLE character_sheets ADD COLUMN appearance_json TEXT')
+            except Exception:
+                pass
     
-    # Create quests table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS quests (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_github_id TEXT NOT NULL,
-            title TEXT NOT NULL,
-            location TEXT NOT NULL,
-            objective TEXT NOT NULL,
-            difficulty TEXT NOT NULL,
-            reward TEXT NOT NULL,
-            game_mode TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    # 🔧 MIGRATION: drop old key_bindings table if schema doesn't match current expected columns
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='key_bindings'")
-    table_exists = cursor.fetchone()
-    if table_exists:
-        cursor.execute("PRAGMA table_info(key_bindings)")
-        cols = [row[1] for row in cursor.fetchall()]
-
-        required_cols = [
-            'secondary_interact_key',
-            'quick_action_key',
-            'quick_menu_key',
-            'screenshot_key'
-        ]
+        # Create quests table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS quests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_github_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                location TEXT NOT NULL,
+                objective TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                reward TEXT NOT NULL,
+                game_mode TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
 
-        if any(c not in cols for c in required_cols):
-            cursor.execute("DROP TABLE key_bindings")
-
-
-
-    # Do not force-drop key_bindings; preserve user key bindings
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS key_bindings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_github_id TEXT NOT NULL,
-            game_mode TEXT NOT NULL,
-
-            move_up_key TEXT NOT NULL,
-            move_left_key TEXT NOT NULL,
-            move_down_key TEXT NOT NULL,
-            move_right_key TEXT NOT NULL,
-            interact_key TEXT NOT NULL,
-            jump_key TEXT NOT NULL,
-            sprint_key TEXT,
-
-            secondary_interact_key TEXT,
-            quick_action_key TEXT,
-            inventory_key TEXT,
-            map_key TEXT,
-            pause_key TEXT,
-            quick_menu_key TEXT,
-            screenshot_key TEXT,
-
-            tool1_key TEXT,
-            tool2_key TEXT,
-            tool3_key TEXT,
-            tool4_key TEXT,
-            tool5_key TEXT,
-            emote_wheel_key TEXT,
-            craft_menu_key TEXT,
-            cozy_zoom_key TEXT,
-            chill_action_key TEXT,
-            gardening_key TEXT,
-            backpack_key TEXT,
-            decor_mode_key TEXT,
-            cozy_slow_walk_key TEXT,
-            cozy_grid_toggle_key TEXT,
-            cozy_inspect_key TEXT,
-            pet_whistle_key TEXT,
-
-            primary_attack_key TEXT,
-            heavy_attack_key TEXT,
-            ability1_key TEXT,
-            ability2_key TEXT,
-            ability3_key TEXT,
-            ability4_key TEXT,
-            ultimate_key TEXT,
-            dodge_key TEXT,
-            crouch_key TEXT,
-            grenade_key TEXT,
-            reload_key TEXT,
-            execute_key TEXT,
-            melee_key TEXT,
-            weapon_swap_key TEXT,
-            mark_target_key TEXT,
-            focus_state_key TEXT,
-            lock_on_key TEXT,
-            tactical_wheel_key TEXT,
-            taunt_key TEXT,
-
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    # Create game_systems table (for the Game Systems page)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS systems (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_github_id TEXT NOT NULL,
-            game_mode TEXT NOT NULL,
-            systems_json TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        # 🔧 MIGRATION: drop old key_bindings table if schema doesn't match current expected columns
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='key_bindings'")
+        table_exists = cursor.fetchone()
+        if table_exists:
+            cursor.execute("PRAGMA table_info(key_bindings)")
+            cols = [row[1] for row in cursor.fetchall()]
+
+            required_cols = [
+                'secondary_interact_key',
+                'quick_action_key',
+                'quick_menu_key',
+                'screenshot_key'
+            ]
+
+            if any(c not in cols for c in required_cols):
+                cursor.execute("DROP TABLE key_bindings")
+
+
+
+        # Do not force-drop key_bindings; preserve user key bindings
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS key_bindings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_github_id TEXT NOT NULL,
+                game_mode TEXT NOT NULL,
+
+                move_up_key TEXT NOT NULL,
+                move_left_key TEXT NOT NULL,
+                move_down_key TEXT NOT NULL,
+                move_right_key TEXT NOT NULL,
+                interact_key TEXT NOT NULL,
+                jump_key TEXT NOT NULL,
+                sprint_key TEXT,
+
+                secondary_interact_key TEXT,
+                quick_action_key TEXT,
+                inventory_key TEXT,
+                map_key TEXT,
+                pause_key TEXT,
+                quick_menu_key TEXT,
+                screenshot_key TEXT,
+
+                tool1_key TEXT,
+                tool2_key TEXT,
+                tool3_key TEXT,
+                tool4_key TEXT,
+                tool5_key TEXT,
+                emote_wheel_key TEXT,
+                craft_menu_key TEXT,
+                cozy_zoom_key TEXT,
+                chill_action_key TEXT,
+                gardening_key TEXT,
+                backpack_key TEXT,
+                decor_mode_key TEXT,
+                cozy_slow_walk_key TEXT,
+                cozy_grid_toggle_key TEXT,
+                cozy_inspect_key TEXT,
+                pet_whistle_key TEXT,
+
+                primary_attack_key TEXT,
+                heavy_attack_key TEXT,
+                ability1_key TEXT,
+                ability2_key TEXT,
+                ability3_key TEXT,
+                ability4_key TEXT,
+                ultimate_key TEXT,
+                dodge_key TEXT,
+                crouch_key TEXT,
+                grenade_key TEXT,
+                reload_key TEXT,
+                execute_key TEXT,
+                melee_key TEXT,
+                weapon_swap_key TEXT,
+                mark_target_key TEXT,
+                focus_state_key TEXT,
+                lock_on_key TEXT,
+                tactical_wheel_key TEXT,
+                taunt_key TEXT,
+
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Create game_systems table (for the Game Systems page)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS systems (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_github_id TEXT NOT NULL,
+                game_mode TEXT NOT NULL,
+                systems_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+            # Ensure one row per (user, game_mode) so POST can upsert instead of creating duplicates
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_systems_user_mode
+            ON systems (user_github_id, game_mode)
+        ''')
+
+        # Groq analyses by input hash, so identical characters skip the API across restarts
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                cache_key TEXT PRIMARY KEY,
+                analysis TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute(
+            "DELETE FROM analysis_cache WHERE created_at < datetime('now', ?)",
+            (f'-{ANALYSIS_CACHE_TTL} seconds',)
         )
-    ''')
 
-        # Ensure one row per (user, game_mode) so POST can upsert instead of creating duplicates
-    cursor.execute('''
-        CREATE UNIQUE INDEX IF NOT EXISTS idx_systems_user_mode
-        ON systems (user_github_id, game_mode)
-    ''')
+        # Per-user lookups (newest first) become an index range seek instead of a scan + sort
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_character_sheets_user_created
+            ON character_sheets (user_github_id, created_at DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_quests_user_created
+            ON quests (user_github_id, created_at DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_key_bindings_user_mode
+            ON key_bindings (user_github_id, game_mode, created_at DESC)
+        ''')
 
-    conn.commit()
-    conn.close()
+        # Give the query planner statistics once; later starts keep the existing ones
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute('ANALYZE')
+
+        conn.commit()
 
 
 @rpg_api.record_once
 def _init_db_on_register(state):
-    # Runs when the blueprint is registered with the Flask app
+    # Runs once, when the blueprint is registered with the Flask app
+    state.app.config['RPG_DB_PATH'] = get_rpg_db_path(app=state.app)
     init_rpg_db(app=state.app)
+    init_rpg_stats()
+    state.app.extensions['rpg_pool'] = get_rpg_pool(state.app)
+
+
+# --- Request parsing helper ---
+def _pluck(data, *keys):
+    """Stripped string values for `keys`; missing or null fields come back as ''"""
+    return tuple((data.get(key) or '').strip() for key in keys)
+
+# Required request fields, in the order handlers unpack them
+RPG_USER_FIELDS = ('FirstName', 'LastName', 'GitHubID', 'Password')
+RPG_LOGIN_FIELDS = ('GitHubID', 'Password')
+CHARACTER_FIELDS = ('name', 'motivation', 'fear', 'secret')
+
+
+# --- RPG user cache ---
+# GitHub IDs known to be taken. Users are never deleted through this API, so a hit
+# can answer 409 without a query (and before hashing the password).
+_known_github_ids = set()
 
 
 # --- API Resource: RPG User Registration and Retrieval ---
@@ -239,13 +487,16 @@ class RPGDataAPI(Resource):
     def post(self):
         user_data = request.get_json(silent=True) or {}
 
-        first_name = (user_data.get("FirstName") or "").strip()
-        last_name  = (user_data.get("LastName") or "").strip()
-        github_id  = (user_data.get("GitHubID") or "").strip()
-        password   = (user_data.get("Password") or "").strip()
-
-        if not all([first_name, last_name, github_id, password]):
+        values = _pluck(user_data, *RPG_USER_FIELDS)
+        if not all(values):
             return {"message": "All fields are required"}, 400
+        first_name, last_name, github_id, password = values
+
+        # IDs already seen taken are rejected up front instead of after an expensive
+        # password hash; anything else goes straight to the INSERT, whose UNIQUE
+        # constraint is the real check
+        if github_id in _known_github_ids:
+            return {"message": "GitHubID already exists"}, 409
 
         # ✅ CREATE RPG USER (not User)
         user = RPGUser(
@@ -257,7 +508,10 @@ class RPGDataAPI(Resource):
 
         created_user = user.create()
         if created_user is None:
+            # create() only fails on the UNIQUE constraint: a confirmed duplicate
+            _known_github_ids.add(github_id)
             return {"message": "GitHubID already exists"}, 409
+        _known_github_ids.add(github_id)
 
         return {
             "message": "RPG user registered successfully",
@@ -270,8 +524,7 @@ class RPGLoginAPI(Resource):
     def post(self):
         login_data = request.get_json() or {}
 
-        github_id = (login_data.get('GitHubID') or '').strip()
-        password = (login_data.get('Password') or '').strip()
+        github_id, password = _pluck(login_data, *RPG_LOGIN_FIELDS)
 
         if not github_id or not password:
             return {"message": "GitHubID and Password are required"}, 400
@@ -288,6 +541,227 @@ class RPGLoginAPI(Resource):
         }, 200
 
 
+# --- Groq analysis cache ---
+# Identical character submissions (retries, re-rolls of the same idea) reuse the
+# earlier Groq analysis instead of paying for another multi-second call.
+# Only real Groq results are cached; the basic fallback is cheap to rebuild.
+# Entries live in memory (LRU) and in rpg.db's analysis_cache table, which
+# survives restarts and is pruned of expired rows at startup.
+ANALYSIS_CACHE_TTL = 24 * 60 * 60  # seconds
+ANALYSIS_CACHE_SIZE = 1024
+
+_analysis_cache = OrderedDict()  # key -> (expires_at, analysis), least recently used first
+_analysis_cache_lock = threading.Lock()
+
+def _analysis_cache_key(name, motivation, fear, secret, game_mode):
+    # The analysis mentions the character by name, so the name is part of the key as
+    # written; the other fields only steer the text, so case and padding don't matter
+    text = '|'.join((
+        str(game_mode).strip().lower(), name.strip(),
+        motivation.strip().lower(), fear.strip().lower(), secret.strip().lower(),
+    ))
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+SQL_GET_CACHED_ANALYSIS = "SELECT analysis FROM analysis_cache WHERE cache_key = ? AND created_at >= datetime('now', ?)"
+SQL_PUT_CACHED_ANALYSIS = 'INSERT OR REPLACE INTO analysis_cache (cache_key, analysis) VALUES (?, ?)'
+
+def _remember_analysis(key, analysis):
+    with _analysis_cache_lock:
+        _analysis_cache[key] = (time.monotonic() + ANALYSIS_CACHE_TTL, analysis)
+        _analysis_cache.move_to_end(key)
+        while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+
+def _get_cached_analysis(key):
+    with _analysis_cache_lock:
+        entry = _analysis_cache.get(key)
+        if entry is not None:
+            if entry[0] >= time.monotonic():
+                _analysis_cache.move_to_end(key)
+                return entry[1]
+            del _analysis_cache[key]
+
+    # Not in memory (evicted, or this process restarted): try the analysis_cache table
+    try:
+        with get_rpg_pool().reader() as conn:
+            row = conn.execute(SQL_GET_CACHED_ANALYSIS, (key, f'-{ANALYSIS_CACHE_TTL} seconds')).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    _remember_analysis(key, row[0])
+    return row[0]
+
+def _cache_analysis(key, analysis):
+    _remember_analysis(key, analysis)
+    try:
+        with get_rpg_pool().transaction() as conn:
+            conn.execute(SQL_PUT_CACHED_ANALYSIS, (key, analysis))
+    except sqlite3.Error as e:
+        # The in-memory entry still serves this process
+        current_app.logger.warning(f"Could not persist analysis cache entry: {e}")
+
+
+# Keep-alive session for Groq calls: later requests reuse the open TLS connection
+# instead of paying a fresh handshake each time
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+_groq_session = requests.Session()
+# Transient Groq failures (rate limit, 5xx) get two quick retries before falling
+# back to the basic analysis. Read timeouts are not retried and Retry-After is
+# ignored, so a request never waits much longer than the 30s timeout
+_groq_retry = Retry(
+    total=2,
+    read=0,
+    backoff_factor=0.2,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({'POST'}),
+    respect_retry_after_header=False,
+    raise_on_status=False,
+)
+_groq_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_groq_retry))
+
+# Request pieces that are the same for every analysis; only the user prompt varies
+GROQ_REQUEST_BODY = {
+    "model": "llama-3.1-8b-instant",
+    "temperature": 0.8,
+    "max_tokens": 300
+}
+GROQ_SYSTEM_MESSAGE = {"role": "system", "content": "You are a creative RPG character analyst who writes engaging character analyses."}
+
+@functools.lru_cache(maxsize=4)
+def _groq_headers(api_key):
+    return {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json'
+    }
+
+# Most characters accepted by /api/rpg/character/batch
+CHARACTER_BATCH_MAX = 25
+
+# Groq calls are network-bound, so a thread pool overlaps their latency (batch analyses
+# and ?async=1 character creation both run here). Sized to run a full batch at once,
+# with room left for async jobs.
+_analysis_executor = ThreadPoolExecutor(max_workers=CHARACTER_BATCH_MAX + 8, thread_name_prefix='groq-analysis')
+
+# Character POSTs waiting on the soft deadline get their own pool, so they never queue
+# behind batch or async work. A call that misses the deadline keeps its worker for up
+# to the 30s Groq timeout, so 8 request threads can leave several calls running each.
+_deadline_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix='groq-deadline')
+
+# Longest a character POST waits for Groq before answering with the basic analysis
+ANALYSIS_SOFT_DEADLINE = 5  # seconds
+
+def _analyze_in_app(app, character, api_key):
+    """Groq analysis for (name, motivation, fear, secret, game_mode) on a worker thread"""
+    # Worker threads need their own app context for config and logging
+    with app.app_context():
+        return CharacterAPI()._generate_ai_analysis(*character, api_key)
+
+# --- Background analysis jobs (POST /api/rpg/character?async=1) ---
+ANALYSIS_JOB_TTL = 10 * 60  # seconds a job stays pollable
+ANALYSIS_JOB_MAX = 1024
+
+_analysis_jobs = OrderedDict()  # job_id -> (expires_at, status, analysis), oldest first
+_analysis_jobs_lock = threading.Lock()
+
+def _set_analysis_job(job_id, status, analysis=None):
+    with _analysis_jobs_lock:
+        _analysis_jobs[job_id] = (time.monotonic() + ANALYSIS_JOB_TTL, status, analysis)
+        _analysis_jobs.move_to_end(job_id)
+        while len(_analysis_jobs) > ANALYSIS_JOB_MAX:
+            _analysis_jobs.popitem(last=False)
+
+def _get_analysis_job(job_id):
+    with _analysis_jobs_lock:
+        entry = _analysis_jobs.get(job_id)
+        if entry is not None and entry[0] < time.monotonic():
+            del _analysis_jobs[job_id]
+            return None
+        return entry
+
+def _run_analysis_job(app, job_id, character_id, character, api_key):
+    """Worker: generate the Groq analysis and replace the saved placeholder"""
+    with app.app_context():
+        try:
+            analysis = _analyze_in_app(app, character, api_key)
+            if character_id is not None:
+                with get_rpg_pool().transaction() as conn:
+                    conn.execute('UPDATE character_sheets SET analysis = ? WHERE id = ?', (analysis, character_id))
+            _set_analysis_job(job_id, 'done', analysis)
+        except Exception as e:
+            app.logger.error(f"Analysis job {job_id} failed: {e}")
+            _set_analysis_job(job_id, 'failed')
+
+# Character analysis prompts per game mode, filled in with str.format
+_ANALYSIS_PROMPTS = {
+    'cozy': """You are a creative RPG character analyst specializing in cozy, heartwarming games. 
+Analyze this character for a cozy game setting where stories focus on relationships, personal growth, and community:
+
+Character Name: {name}
+Motivation: {motivation}
+Fear: {fear}
+Secret: {secret}
+
+Write a warm, encouraging 3-4 sentence analysis that:
+- Explains how their motivation connects them to community and personal growth
+- Describes how their fear adds relatable vulnerability
+- Shows how their secret creates intrigue without being too dark
+- Suggests a positive character arc focused on connection and healing
+
+Keep the tone gentle, optimistic, and focused on emotional growth.""",
+    'action': """You are a creative RPG character analyst specializing in action-adventure games.
+Analyze this character for an action-packed game setting with quests, challenges, and dramatic storytelling:
+
+Character Name: {name}
+Motivation: {motivation}
+Fear: {fear}
+Secret: {secret}
+
+Write an exciting 3-4 sentence analysis that:
+- Explains how their motivation drives them through dangerous quests
+- Describes the internal conflict their fear creates
+- Shows how their secret adds dramatic complexity
+- Suggests how motivation and fear create tension in their character arc
+
+Keep the tone dynamic, compelling, and focused on adventure and conflict.""",
+}
+
+def _groq_analysis_body(name, motivation, fear, secret, game_mode, stream=False):
+    """Groq chat request for a character analysis (action prompt unless the mode has its own)"""
+    prompt = _ANALYSIS_PROMPTS.get(game_mode, _ANALYSIS_PROMPTS['action']).format(
+        name=name, motivation=motivation, fear=fear, secret=secret
+    )
+    body = {**GROQ_REQUEST_BODY, "messages": [GROQ_SYSTEM_MESSAGE, {"role": "user", "content": prompt}]}
+    if stream:
+        body["stream"] = True
+    return body
+
+# Fallback analysis per game mode when Groq is unavailable; only the name varies
+_BASIC_ANALYSES = {
+    'cozy': "{name} has a gentle but determined spirit, with motivations that connect them to their community. Their fear represents vulnerability that makes them relatable and human, while their secret adds intrigue without overwhelming darkness. This character's journey will be one of personal growth and connection, where their motivation guides them to help others, their fear teaches them compassion, and their secret becomes something they learn to share and find acceptance for.",
+    'action': "{name} is driven by a powerful motivation that will push them through the most dangerous quests. Their greatest fear creates internal conflict that adds depth to their journey, while their hidden secret provides opportunities for dramatic revelation. This character's motivation and fear are in tension, creating a compelling arc where they must face what they fear most to achieve what they desire.",
+}
+
+def _character_game_mode(value):
+    """gameMode from a request: a known mode, else 'action' (also for null, lists, ...)"""
+    return value if isinstance(value, str) and value in _BASIC_ANALYSES else 'action'
+
+
+SQL_INS_CHARACTER = '''
+    INSERT INTO character_sheets (user_github_id, name, motivation, fear, secret, game_mode, analysis, appearance_json)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+# Columns selected for GET /api/rpg/character, and the response key for each
+CHARACTER_KEYS = ('id', 'name', 'motivation', 'fear', 'secret', 'gameMode', 'analysis', 'appearance', 'createdAt')
+SQL_GET_CHARACTER = '''
+    SELECT id, name, motivation, fear, secret, game_mode, analysis, appearance_json, created_at
+    FROM character_sheets
+    WHERE user_github_id = ?
+    ORDER BY created_at DESC
+    LIMIT 1
+'''
+
+
 # --- API Resource: Character Creation ---
 class CharacterAPI(Resource):
     def post(self):
@@ -295,86 +769,72 @@ class CharacterAPI(Resource):
         try:
             data = request.get_json()
 
-            # CRITICAL DEBUG LOGGING
-            print("\n" + "="*80)
-            print("🔥 CHARACTER CREATION REQUEST RECEIVED")
-            print("="*80)
-            print(f"📦 Full request data: {data}")
-            print(f"🔑 Data keys: {list(data.keys()) if data else 'NO DATA'}")
-            print(f"👤 userGithubId value: '{data.get('userGithubId', 'NOT PROVIDED')}'")
-            print("="*80 + "\n")
+            # Debug logging only; arguments are formatted only when DEBUG is enabled
+            logger = current_app.logger
+            logger.debug("🔥 Character creation request received: %s", data)
 
             # Extract form data
-            name = data.get('name', '').strip()
-            motivation = data.get('motivation', '').strip()
-            fear = data.get('fear', '').strip()
-            secret = data.get('secret', '').strip()
-            game_mode = data.get('gameMode', 'action')
+            *required, user_github_id = _pluck(data, *CHARACTER_FIELDS, 'userGithubId')
+            game_mode = _character_game_mode(data.get('gameMode'))
 
             # Validate required fields
-            if not all([name, motivation, fear, secret]):
+            if not all(required):
                 return {'message': 'All fields are required'}, 400
+            name, motivation, fear, secret = required
 
             # Get Groq API key
             api_key = current_app.config.get('GROQ_API_KEY')
 
             # Log API key status for debugging
-            current_app.logger.info(f"GROQ API Key configured: {bool(api_key)}")
-
-            if not api_key:
-                # Fallback to basic analysis if API key not configured
-                current_app.logger.warning("GROQ_API_KEY not found, using basic analysis")
-                print("⚠️ GROQ_API_KEY not found - using basic analysis")
-                analysis = self._generate_basic_analysis(name, motivation, fear, secret, game_mode)
-            else:
-                # Generate AI-powered character analysis
-                current_app.logger.info("Generating AI-powered character analysis with Groq")
-                print(f"✅ GROQ_API_KEY found - generating AI analysis for {name}")
-                analysis = self._generate_ai_analysis(name, motivation, fear, secret, game_mode, api_key)
-                print(f"📝 AI Analysis generated: {analysis[:100]}...")
+            logger.debug("GROQ API Key configured: %s", bool(api_key))
 
-            # Get user GitHub ID if provided (for saving to database)
-            user_github_id = data.get('userGithubId', '').strip()
             # Appearance payload (optional)
-            import json as _json
             appearance = data.get('appearance') or {}
 
-            print(f"\n🔍 ATTEMPTING TO SAVE CHARACTER:")
-            print(f"   User GitHub ID: '{user_github_id}'")
-            print(f"   Character Name: '{name}'")
+            if api_key and request.accept_mimetypes.best == 'text/event-stream':
+                # Opt-in: stream the analysis as Groq writes it (Server-Sent Events)
+                return self._stream_character(
+                    name, motivation, fear, secret, game_mode, api_key, user_github_id, appearance
+                )
 
-            # Save to database if user is logged in
-            character_id = None
-            if user_github_id:
-                print(f"   ✅ User ID provided - will save to database")
-                try:
-                    db_path = get_rpg_db_path()
-                    conn = sqlite3.connect(db_path)
-                    cursor = conn.cursor()
-
-                    # Determine presence of appearance_json column
-                    cursor.execute("PRAGMA table_info(character_sheets)")
-                    _cols = [row[1] for row in cursor.fetchall()]
-                    if 'appearance_json' in _cols:
-                        cursor.execute('''
-                            INSERT INTO character_sheets (user_github_id, name, motivation, fear, secret, game_mode, analysis, appearance_json)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (user_github_id, name, motivation, fear, secret, game_mode, analysis, _json.dumps(appearance)))
-                    else:
-                        cursor.execute('''
-                            INSERT INTO character_sheets (user_github_id, name, motivation, fear, secret, game_mode, analysis)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        ''', (user_github_id, name, motivation, fear, secret, game_mode, analysis))
-
-                    character_id = cursor.lastrowid
-                    conn.commit()
-                    conn.close()
-                    print(f"   💾 ✅ Character saved to database with ID: {character_id}\n")
-                except Exception as db_error:
-                    print(f"   ❌ Failed to save character to database: {db_error}\n")
+            job_id = None
+            if not api_key:
+                # Fallback to basic analysis if API key not configured
+                logger.warning("GROQ_API_KEY not found, using basic analysis")
+                analysis = self._generate_basic_analysis(name, game_mode)
+            elif request.args.get('async', '').lower() in ('1', 'true'):
+                # Opt-in: answer now with the basic analysis and let the client poll
+                # for the Groq one instead of holding this worker for the call
+                analysis = _get_cached_analysis(_analysis_cache_key(name, motivation, fear, secret, game_mode))
+                if analysis is None:
+                    analysis = self._generate_basic_analysis(name, game_mode)
+                    job_id = uuid.uuid4().hex
             else:
-                print(f"   ⚠️  NO USER ID - Character will NOT be saved to database!\n")
-                print(f"   ⚠️  Frontend must send 'userGithubId' in the request body.\n")
+                # Generate AI-powered character analysis
+                logger.debug("Generating AI-powered character analysis with Groq")
+                future = _deadline_executor.submit(
+                    _analyze_in_app, current_app._get_current_object(),
+                    (name, motivation, fear, secret, game_mode), api_key
+                )
+                try:
+                    analysis = future.result(timeout=ANALYSIS_SOFT_DEADLINE)
+                    logger.debug("📝 AI analysis generated for %s: %.100s", name, analysis)
+                except TimeoutError:
+                    # Slow Groq call: answer with the basic analysis now; the call keeps
+                    # running and caches its result, so a retry gets the AI version
+                    logger.warning("Groq analysis for %r missed the %ss deadline, using basic analysis", name, ANALYSIS_SOFT_DEADLINE)
+                    analysis = self._generate_basic_analysis(name, game_mode)
+
+            character_id = self._save_character(
+                user_github_id, name, motivation, fear, secret, game_mode, analysis, appearance
+            )
+
+            if job_id is not None:
+                _set_analysis_job(job_id, 'pending')
+                _analysis_executor.submit(
+                    _run_analysis_job, current_app._get_current_object(), job_id, character_id,
+                    (name, motivation, fear, secret, game_mode), api_key
+                )
 
             # Create character sheet response
             character_sheet = {
@@ -388,207 +848,398 @@ class CharacterAPI(Resource):
                 'appearance': appearance
             }
 
+            if job_id is not None:
+                character_sheet['analysisJob'] = {
+                    'id': job_id,
+                    'status': 'pending',
+                    'url': f'/api/rpg/character/analysis/{job_id}'
+                }
+                return character_sheet, 202
+
             return character_sheet, 200
 
         except Exception as e:
             return {'message': f'Error creating character: {str(e)}'}, 500
 
+    @staticmethod
+    def _save_character(user_github_id, name, motivation, fear, secret, game_mode, analysis, appearance):
+        """Save the sheet if the user is logged in; returns the new id or None"""
+        logger = current_app.logger
+        if not user_github_id:
+            logger.debug("⚠️ No userGithubId in request - character %r not saved", name)
+            return None
+        try:
+            # appearance_json is guaranteed by the migration in init_rpg_db
+            with get_rpg_pool().transaction() as conn:
+                character_id = conn.execute(
+                    SQL_INS_CHARACTER,
+                    (user_github_id, name, motivation, fear, secret, game_mode, analysis, json.dumps(appearance))
+                ).lastrowid
+            logger.debug("💾 Character %r saved for %s with ID %s", name, user_github_id, character_id)
+            return character_id
+        except Exception as db_error:
+            logger.error("❌ Failed to save character to database: %s", db_error)
+            return None
+
+    def _stream_character(self, name, motivation, fear, secret, game_mode, api_key, user_github_id, appearance):
+        """Server-Sent Events response for character creation
+
+        Sends `analysis` events with {"delta": text} as Groq produces tokens, then a
+        `done` event with the saved character sheet (same shape as the JSON response).
+        """
+        cache_key = _analysis_cache_key(name, motivation, fear, secret, game_mode)
+
+        def event(kind, data):
+            return f'event: {kind}\ndata: {current_app.json.dumps(data)}\n\n'
+
+        def events():
+            analysis = _get_cached_analysis(cache_key)
+            try:
+                if analysis is not None:
+                    yield event('analysis', {'delta': analysis})
+                else:
+                    chunks = []
+                    try:
+                        for chunk in self._stream_ai_analysis(name, motivation, fear, secret, game_mode, api_key):
+                            chunks.append(chunk)
+                            yield event('analysis', {'delta': chunk})
+                        analysis = ''.join(chunks).strip()
+                        _cache_analysis(cache_key, analysis)
+                    except Exception as e:
+                        # The `done` event carries the fallback; clients replace any partial text with it
+                        current_app.logger.error(f"Error streaming AI analysis: {e}")
+                        analysis = self._generate_basic_analysis(name, game_mode)
+            finally:
+                # Saved even when the client disconnects mid-stream (the generator is
+                # closed at a yield), with the basic analysis in place of the partial text
+                if analysis is None:
+                    analysis = self._generate_basic_analysis(name, game_mode)
+                character_id = self._save_character(
+                    user_github_id, name, motivation, fear, secret, game_mode, analysis, appearance
+                )
+            yield event('done', {
+                'id': character_id,
+                'name': name,
+                'motivation': motivation,
+                'fear': fear,
+                'secret': secret,
+                'gameMode': game_mode,
+                'analysis': analysis,
+                'appearance': appearance
+            })
+
+        response = current_app.response_class(stream_with_context(events()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _stream_ai_analysis(self, name, motivation, fear, secret, game_mode, api_key):
+        """Yield the Groq analysis text in pieces as it is generated"""
+        with _groq_session.post(
+            GROQ_CHAT_URL,
+            headers=_groq_headers(api_key),
+            json=_groq_analysis_body(name, motivation, fear, secret, game_mode, stream=True),
+            timeout=30,
+            stream=True
+        ) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Groq API error: {response.status_code} - {response.text}")
+            # OpenAI-style stream: `data: {json}` lines, terminated by `data: [DONE]`
+            for line in response.iter_lines():
+                if not line.startswith(b'data: '):
+                    continue
+                payload = line[6:]
+                if payload == b'[DONE]':
+                    break
+                delta = json.loads(payload)['choices'][0]['delta'].get('content')
+                if delta:
+                    yield delta
+
     def get(self):
         try:
-            import json as _json
             user_github_id = request.args.get('userGithubId', '').strip()
             if not user_github_id:
                 return {'message': 'User GitHub ID is required'}, 400
 
-            db_path = get_rpg_db_path()
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-            SELECT * FROM character_sheets
-            WHERE user_github_id = ?
-            ORDER BY created_at DESC
-            LIMIT 1
-            ''', (user_github_id,))
-            row = cursor.fetchone()
-            conn.close()
+            with get_rpg_pool().reader() as conn:
+                # Plain tuple rows, zipped straight into the response keys
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                cursor.execute(SQL_GET_CHARACTER, (user_github_id,))
+                row = cursor.fetchone()
 
             if not row:
                 return {'character': None}, 200
 
-            appearance = {}
+            character = dict(zip(CHARACTER_KEYS, row))
             try:
-                if 'appearance_json' in row.keys() and row['appearance_json']:
-                    appearance = _json.loads(row['appearance_json'])
+                character['appearance'] = json.loads(character['appearance'] or '{}')
             except Exception:
-                appearance = {}
-
-            character = {
-                'id': row['id'],
-                'name': row['name'],
-                'motivation': row['motivation'],
-                'fear': row['fear'],
-                'secret': row['secret'],
-                'gameMode': row['game_mode'],
-                'analysis': row['analysis'],
-                'appearance': appearance,
-                'createdAt': row['created_at']
-            }
+                character['appearance'] = {}
+
             return {'character': character}, 200
         except Exception as e:
             return {'message': f'Error retrieving characters: {str(e)}'}, 500
 
     def _generate_ai_analysis(self, name, motivation, fear, secret, game_mode, api_key):
         """Generate character analysis using Groq AI"""
-        try:
-            # Create a prompt based on game mode
-            if game_mode == 'cozy':
-                prompt = f"""You are a creative RPG character analyst specializing in cozy, heartwarming games. 
-Analyze this character for a cozy game setting where stories focus on relationships, personal growth, and community:
-
-Character Name: {name}
-Motivation: {motivation}
-Fear: {fear}
-Secret: {secret}
-
-Write a warm, encouraging 3-4 sentence analysis that:
-- Explains how their motivation connects them to community and personal growth
-- Describes how their fear adds relatable vulnerability
-- Shows how their secret creates intrigue without being too dark
-- Suggests a positive character arc focused on connection and healing
-
-Keep the tone gentle, optimistic, and focused on emotional growth."""
-            else:
-                prompt = f"""You are a creative RPG character analyst specializing in action-adventure games.
-Analyze this character for an action-packed game setting with quests, challenges, and dramatic storytelling:
-
-Character Name: {name}
-Motivation: {motivation}
-Fear: {fear}
-Secret: {secret}
-
-Write an exciting 3-4 sentence analysis that:
-- Explains how their motivation drives them through dangerous quests
-- Describes the internal conflict their fear creates
-- Shows how their secret adds dramatic complexity
-- Suggests how motivation and fear create tension in their character arc
-
-Keep the tone dynamic, compelling, and focused on adventure and conflict."""
+        cache_key = _analysis_cache_key(name, motivation, fear, secret, game_mode)
+        cached = _get_cached_analysis(cache_key)
+        if cached is not None:
+            return cached
 
+        try:
             # Call Groq API
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    'Authorization': f'Bearer {api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    "model": "llama-3.1-8b-instant",
-                    "messages": [
-                        {"role": "system", "content": "You are a creative RPG character analyst who writes engaging character analyses."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.8,
-                    "max_tokens": 300
-                },
+            response = _groq_session.post(
+                GROQ_CHAT_URL,
+                headers=_groq_headers(api_key),
+                json=_groq_analysis_body(name, motivation, fear, secret, game_mode),
                 timeout=30
             )
 
             if response.status_code == 200:
                 result = response.json()
                 analysis = result['choices'][0]['message']['content'].strip()
-                print(f"✨ Success! Groq API returned: {analysis[:50]}...")
+                current_app.logger.debug("✨ Groq API returned: %.50s", analysis)
+                _cache_analysis(cache_key, analysis)
                 return analysis
             else:
                 # Fallback to basic analysis if API call fails
                 current_app.logger.error(f"Groq API error: {response.status_code} - {response.text}")
-                print(f"❌ Groq API error: {response.status_code}")
-                return self._generate_basic_analysis(name, motivation, fear, secret, game_mode)
+                return self._generate_basic_analysis(name, game_mode)
 
         except Exception as e:
             # Fallback to basic analysis on error
             current_app.logger.error(f"Error generating AI analysis: {e}")
-            return self._generate_basic_analysis(name, motivation, fear, secret, game_mode)
+            return self._generate_basic_analysis(name, game_mode)
 
-    def _generate_basic_analysis(self, name, motivation, fear, secret, game_mode):
-        """Fallback basic analysis if AI is unavailable"""
-        if game_mode == 'cozy':
-            return f"{name} has a gentle but determined spirit, with motivations that connect them to their community. Their fear represents vulnerability that makes them relatable and human, while their secret adds intrigue without overwhelming darkness. This character's journey will be one of personal growth and connection, where their motivation guides them to help others, their fear teaches them compassion, and their secret becomes something they learn to share and find acceptance for."
-        else:
-            return f"{name} is driven by a powerful motivation that will push them through the most dangerous quests. Their greatest fear creates internal conflict that adds depth to their journey, while their hidden secret provides opportunities for dramatic revelation. This character's motivation and fear are in tension, creating a compelling arc where they must face what they fear most to achieve what they desire."
+    def _generate_basic_analysis(self, name, game_mode):
+        """Fallback basic analysis if AI is unavailable (only the name is filled in)"""
+        return _BASIC_ANALYSES.get(game_mode, _BASIC_ANALYSES['action']).format(name=name)
+
+
+# --- API Resource: Background Analysis Polling ---
+class CharacterAnalysisJobAPI(Resource):
+    """Result of a background character analysis
+
+    Frontend: polls after `POST /api/rpg/character?async=1` returned `analysisJob`.
+    Endpoint: `/api/rpg/character/analysis/<job_id>`.
+    Status is 'pending', 'done' (with `analysis`) or 'failed'.
+    """
+    def get(self, job_id):
+        job = _get_analysis_job(job_id)
+        if job is None:
+            return {'message': 'Analysis job not found'}, 404
+        _, status, analysis = job
+        return {'id': job_id, 'status': status, 'analysis': analysis}, 200
+
+
+# --- API Resource: Batch Character Analysis ---
+class CharacterBatchAPI(Resource):
+    """Create several character sheets in one request
+
+    Frontend: party creation, which would otherwise POST one character at a time.
+    Endpoint: `/api/rpg/character/batch`.
+
+    Body JSON:
+      {"characters": [{name, motivation, fear, secret, gameMode, appearance, userGithubId}, ...]}
+    The Groq analyses run concurrently and the pool has a worker for every character
+    of a full batch, so a batch takes about as long as its slowest character rather
+    than the sum of all of them (longer only while other batches hold the workers).
+    """
+    def post(self):
+        data = request.get_json(silent=True) or {}
+        items = data.get('characters') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return {'message': 'characters must be a non-empty list'}, 400
+        if len(items) > CHARACTER_BATCH_MAX:
+            return {'message': f'At most {CHARACTER_BATCH_MAX} characters per batch'}, 400
+
+        characters = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                return {'message': f'Character {index} must be an object'}, 400
+            *required, user_github_id = _pluck(item, *CHARACTER_FIELDS, 'userGithubId')
+            if not all(required):
+                return {'message': f'All fields are required (character {index})'}, 400
+            name, motivation, fear, secret = required
+            characters.append({
+                'name': name,
+                'motivation': motivation,
+                'fear': fear,
+                'secret': secret,
+                'gameMode': _character_game_mode(item.get('gameMode')),
+                'appearance': item.get('appearance') or {},
+                'userGithubId': user_github_id,
+            })
+
+        try:
+            analyzer = CharacterAPI()
+            api_key = current_app.config.get('GROQ_API_KEY')
+            if api_key:
+                app = current_app._get_current_object()
+
+                def analyze(c):
+                    return _analyze_in_app(
+                        app, (c['name'], c['motivation'], c['fear'], c['secret'], c['gameMode']), api_key
+                    )
+
+                # Cached analyses are used as-is; duplicates within the batch share one Groq call
+                keys = [
+                    _analysis_cache_key(c['name'], c['motivation'], c['fear'], c['secret'], c['gameMode'])
+                    for c in characters
+                ]
+                by_key = {}
+                pending = {}
+                for key, c in zip(keys, characters):
+                    if key in by_key or key in pending:
+                        continue
+                    cached = _get_cached_analysis(key)
+                    if cached is not None:
+                        by_key[key] = cached
+                    else:
+                        pending[key] = c
+                by_key.update(zip(pending, _analysis_executor.map(analyze, pending.values())))
+                analyses = [by_key[key] for key in keys]
+            else:
+                analyses = [
+                    analyzer._generate_basic_analysis(c['name'], c['gameMode'])
+                    for c in characters
+                ]
+
+            # Save the logged-in users' characters in one transaction
+            ids = [None] * len(characters)
+            with get_rpg_pool().transaction() as conn:
+                for index, (c, analysis) in enumerate(zip(characters, analyses)):
+                    if c['userGithubId']:
+                        ids[index] = conn.execute(
+                            SQL_INS_CHARACTER,
+                            (c['userGithubId'], c['name'], c['motivation'], c['fear'], c['secret'],
+                             c['gameMode'], analysis, json.dumps(c['appearance']))
+                        ).lastrowid
+
+            return {'characters': [
+                {
+                    'id': character_id,
+                    'name': c['name'],
+                    'motivation': c['motivation'],
+                    'fear': c['fear'],
+                    'secret': c['secret'],
+                    'gameMode': c['gameMode'],
+                    'analysis': analysis,
+                    'appearance': c['appearance'],
+                }
+                for character_id, c, analysis in zip(ids, characters, analyses)
+            ]}, 200
+
+        except Exception as e:
+            traceback.print_exc()
+            return {'message': f'Error creating characters: {str(e)}'}, 500
 
 # --- API Resource for Quest Creation and Retrieval ---
+QUEST_REQUIRED_FIELDS = ('title', 'location', 'objective', 'difficulty', 'reward', 'userGithubId')
+QUEST_BATCH_MAX = 100
+SQL_INS_QUEST = '''
+    INSERT INTO quests (user_github_id, title, location, objective, difficulty, reward, game_mode)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+# Columns selected for GET /api/rpg/quests, and the response key for each
+QUEST_KEYS = ('id', 'title', 'location', 'objective', 'difficulty', 'reward', 'gameMode')
+SQL_GET_QUESTS = '''
+    SELECT id, title, location, objective, difficulty, reward, game_mode
+    FROM quests
+    WHERE user_github_id = ?
+    ORDER BY created_at DESC
+'''
+
 class QuestAPI(Resource):
     """Quest endpoints
 
     Frontend: quest creation/listing in the game UI.
     Endpoints: `/api/rpg/quest` and `/api/rpg/quests`.
     """
+    @staticmethod
+    def _parse_quest(data):
+        """(quest dict without id, missing field names) for one quest payload"""
+        values = _pluck(data, *QUEST_REQUIRED_FIELDS)
+        title, location, objective, difficulty, reward, user_github_id = values
+        missing = [field for field, value in zip(QUEST_REQUIRED_FIELDS, values) if not value]
+        quest = {
+            'userGithubId': user_github_id,
+            'title': title,
+            'location': location,
+            'objective': objective,
+            'difficulty': difficulty,
+            'reward': reward,
+            'gameMode': data.get('gameMode', 'action')
+        }
+        return quest, missing
+
+    @staticmethod
+    def _quest_row(quest):
+        return (quest['userGithubId'], quest['title'], quest['location'], quest['objective'],
+                quest['difficulty'], quest['reward'], quest['gameMode'])
+
     def post(self):
-        """Create a new quest and add to quest log"""
+        """Create a new quest (JSON object) or several at once (JSON array) and add to quest log"""
         try:
             data = request.get_json()
 
-            print(f"📝 Quest creation request received: {data}")
+            logger = current_app.logger
+            logger.debug("📝 Quest creation request received: %s", data)
 
-            # Extract quest data
-            title = data.get('title', '').strip()
-            location = data.get('location', '').strip()
-            objective = data.get('objective', '').strip()
-            difficulty = data.get('difficulty', '').strip()
-            reward = data.get('reward', '').strip()
-            game_mode = data.get('gameMode', 'action')
-            user_github_id = data.get('userGithubId', '').strip()  # Get user ID from frontend
+            if isinstance(data, list):
+                return self._post_many(data)
 
-            print(f"✅ Parsed data - User: {user_github_id}, Title: {title}")
-
-            # Validate required fields
-            if not all([title, location, objective, difficulty, reward, user_github_id]):
-                missing = []
-                if not title: missing.append('title')
-                if not location: missing.append('location')
-                if not objective: missing.append('objective')
-                if not difficulty: missing.append('difficulty')
-                if not reward: missing.append('reward')
-                if not user_github_id: missing.append('userGithubId')
-                print(f"❌ Missing fields: {missing}")
+            # Extract and validate quest data
+            quest, missing = self._parse_quest(data)
+            if missing:
+                logger.debug("❌ Quest missing fields: %s", missing)
                 return {'message': f'Missing required fields: {", ".join(missing)}'}, 400
 
             # Save to database with user association
-            db_path = get_rpg_db_path()
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with get_rpg_pool().transaction() as conn:
+                quest_id = conn.execute(SQL_INS_QUEST, self._quest_row(quest)).lastrowid
 
-            cursor.execute('''
-                INSERT INTO quests (user_github_id, title, location, objective, difficulty, reward, game_mode)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (user_github_id, title, location, objective, difficulty, reward, game_mode))
-
-            quest_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-
-            print(f"✨ Quest created successfully with ID: {quest_id}")
+            logger.debug("✨ Quest created with ID %s for %s", quest_id, quest['userGithubId'])
 
             # Return the quest data
-            quest = {
-                'id': quest_id,
-                'title': title,
-                'location': location,
-                'objective': objective,
-                'difficulty': difficulty,
-                'reward': reward,
-                'gameMode': game_mode
-            }
-
-            return quest, 201
+            quest.pop('userGithubId')
+            return {'id': quest_id, **quest}, 201
 
         except Exception as e:
-            print(f"💥 Error creating quest: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            current_app.logger.exception("💥 Error creating quest")
             return {'message': f'Error creating quest: {str(e)}'}, 500
 
+    def _post_many(self, items):
+        """Insert a list of quests with one executemany in one transaction"""
+        if not items:
+            return {'message': 'No quests provided'}, 400
+        if len(items) > QUEST_BATCH_MAX:
+            return {'message': f'At most {QUEST_BATCH_MAX} quests per request'}, 400
+
+        quests = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                return {'message': f'Quest {index} must be an object'}, 400
+            quest, missing = self._parse_quest(item)
+            if missing:
+                return {'message': f'Quest {index}: missing required fields: {", ".join(missing)}'}, 400
+            quests.append(quest)
+
+        with get_rpg_pool().transaction() as conn:
+            conn.executemany(SQL_INS_QUEST, [self._quest_row(quest) for quest in quests])
+            # The writer lock makes the batch's AUTOINCREMENT ids consecutive
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+
+        first_id = last_id - len(quests) + 1
+        created = []
+        for offset, quest in enumerate(quests):
+            quest.pop('userGithubId')
+            created.append({'id': first_id + offset, **quest})
+        current_app.logger.debug("✨ %d quests created (IDs %s-%s)", len(created), first_id, last_id)
+
+        return {'quests': created}, 201
+
     def get(self):
         """Get all quests for a specific user"""
         try:
@@ -598,32 +1249,13 @@ class QuestAPI(Resource):
             if not user_github_id:
                 return {'message': 'User GitHub ID is required'}, 400
 
-            db_path = get_rpg_db_path()
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            # Only get quests for this specific user
-            cursor.execute('''
-                SELECT * FROM quests 
-                WHERE user_github_id = ? 
-                ORDER BY created_at DESC
-            ''', (user_github_id,))
+            with get_rpg_pool().reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
 
-            rows = cursor.fetchall()
-            conn.close()
-
-            quests = []
-            for row in rows:
-                quests.append({
-                    'id': row['id'],
-                    'title': row['title'],
-                    'location': row['location'],
-                    'objective': row['objective'],
-                    'difficulty': row['difficulty'],
-                    'reward': row['reward'],
-                    'gameMode': row['game_mode']
-                })
+                # Only get quests for this specific user
+                cursor.execute(SQL_GET_QUESTS, (user_github_id,))
+                quests = [dict(zip(QUEST_KEYS, row)) for row in cursor]
 
             return {'quests': quests}, 200
 
@@ -631,6 +1263,92 @@ class QuestAPI(Resource):
             return {'message': f'Error retrieving quests: {str(e)}'}, 500
 
 # --- API Resource for Key Binding Creation and Retrieval ---
+# (column, JSON key) for every binding, in key_bindings column order. This one
+# table drives request parsing, validation, the INSERT and both responses.
+KEYBIND_FIELDS = (
+    # Core movement & interaction
+    ('move_up_key', 'moveUpKey'),
+    ('move_left_key', 'moveLeftKey'),
+    ('move_down_key', 'moveDownKey'),
+    ('move_right_key', 'moveRightKey'),
+    ('interact_key', 'interactKey'),
+    ('jump_key', 'jumpKey'),
+    ('sprint_key', 'sprintKey'),
+    # Universal extras
+    ('secondary_interact_key', 'secondaryInteractKey'),
+    ('quick_action_key', 'quickActionKey'),
+    ('inventory_key', 'inventoryKey'),
+    ('map_key', 'mapKey'),
+    ('pause_key', 'pauseKey'),
+    ('quick_menu_key', 'quickMenuKey'),
+    ('screenshot_key', 'screenshotKey'),
+    # Cozy extras
+    ('tool1_key', 'tool1Key'),
+    ('tool2_key', 'tool2Key'),
+    ('tool3_key', 'tool3Key'),
+    ('tool4_key', 'tool4Key'),
+    ('tool5_key', 'tool5Key'),
+    ('emote_wheel_key', 'emoteWheelKey'),
+    ('craft_menu_key', 'craftMenuKey'),
+    ('cozy_zoom_key', 'cozyZoomKey'),
+    ('chill_action_key', 'chillActionKey'),
+    ('gardening_key', 'gardeningKey'),
+    ('backpack_key', 'backpackKey'),
+    ('decor_mode_key', 'decorModeKey'),
+    ('cozy_slow_walk_key', 'cozySlowWalkKey'),
+    ('cozy_grid_toggle_key', 'cozyGridToggleKey'),
+    ('cozy_inspect_key', 'cozyInspectKey'),
+    ('pet_whistle_key', 'petWhistleKey'),
+    # Action combat
+    ('primary_attack_key', 'primaryAttackKey'),
+    ('heavy_attack_key', 'heavyAttackKey'),
+    ('ability1_key', 'ability1Key'),
+    ('ability2_key', 'ability2Key'),
+    ('ability3_key', 'ability3Key'),
+    ('ability4_key', 'ability4Key'),
+    ('ultimate_key', 'ultimateKey'),
+    ('dodge_key', 'dodgeKey'),
+    ('crouch_key', 'crouchKey'),
+    ('grenade_key', 'grenadeKey'),
+    ('reload_key', 'reloadKey'),
+    ('execute_key', 'executeKey'),
+    ('melee_key', 'meleeKey'),
+    ('weapon_swap_key', 'weaponSwapKey'),
+    ('mark_target_key', 'markTargetKey'),
+    ('focus_state_key', 'focusStateKey'),
+    ('lock_on_key', 'lockOnKey'),
+    ('tactical_wheel_key', 'tacticalWheelKey'),
+    ('taunt_key', 'tauntKey'),
+)
+# Stored as given (NOT NULL columns); everything else is stored as NULL when empty.
+# jumpKey may be left empty in cozy mode.
+KEYBIND_REQUIRED_FIELDS = ('moveUpKey', 'moveLeftKey', 'moveDownKey', 'moveRightKey', 'interactKey', 'jumpKey')
+
+KEYBIND_JSON_KEYS = tuple(json_key for _, json_key in KEYBIND_FIELDS)
+_KEYBIND_NULLABLE = tuple(json_key not in KEYBIND_REQUIRED_FIELDS for json_key in KEYBIND_JSON_KEYS)
+KEYBIND_RESPONSE_KEYS = ('id', 'userGithubId', 'gameMode') + KEYBIND_JSON_KEYS + ('createdAt',)
+_SQL_SELECT_KEYBIND = 'SELECT id, user_github_id, game_mode, {}, created_at FROM key_bindings'.format(
+    ', '.join(column for column, _ in KEYBIND_FIELDS)
+)
+# Built once so every request reuses the same statement text (and the cached prepared statement)
+SQL_GET_KEYBIND_LATEST = _SQL_SELECT_KEYBIND + '''
+    WHERE user_github_id = ?
+    ORDER BY created_at DESC
+    LIMIT 1
+'''
+SQL_GET_KEYBIND_MODE = _SQL_SELECT_KEYBIND + '''
+    WHERE user_github_id = ? AND game_mode = ?
+    ORDER BY created_at DESC
+    LIMIT 1
+'''
+# Longest value accepted for a single binding (e.g. 'ArrowLeft', 'ShiftLeft')
+MAX_KEYBIND_LENGTH = 32
+
+# One statement for every request: omitted optional keys are bound as NULL
+SQL_INS_KEYBIND = 'INSERT INTO key_bindings (user_github_id, game_mode, {}) VALUES ({})'.format(
+    ', '.join(column for column, _ in KEYBIND_FIELDS), ', '.join(['?'] * (len(KEYBIND_FIELDS) + 2))
+)
+
 class KeyBindingAPI(Resource):
     """Key bindings management
 
@@ -642,262 +1360,40 @@ class KeyBindingAPI(Resource):
         try:
             data = request.get_json()
 
-            user_github_id = data.get('userGithubId', '').strip()
-            game_mode = data.get('gameMode', 'action').strip() or 'action'
-
-            # Core movement & interaction
-            move_up_key = data.get('moveUpKey', '').strip()
-            move_left_key = data.get('moveLeftKey', '').strip()
-            move_down_key = data.get('moveDownKey', '').strip()
-            move_right_key = data.get('moveRightKey', '').strip()
-            interact_key = data.get('interactKey', '').strip()
-            jump_key = data.get('jumpKey', '').strip()
-            sprint_key = data.get('sprintKey', '').strip()  # optional
-
-            # Universal extras
-            secondary_interact_key = data.get('secondaryInteractKey', '').strip()
-            quick_action_key = data.get('quickActionKey', '').strip()
-            inventory_key = data.get('inventoryKey', '').strip()
-            map_key = data.get('mapKey', '').strip()
-            pause_key = data.get('pauseKey', '').strip()
-            quick_menu_key = data.get('quickMenuKey', '').strip()
-            screenshot_key = data.get('screenshotKey', '').strip()
-
-            # Cozy extras
-            tool1_key = data.get('tool1Key', '').strip()
-            tool2_key = data.get('tool2Key', '').strip()
-            tool3_key = data.get('tool3Key', '').strip()
-            tool4_key = data.get('tool4Key', '').strip()
-            tool5_key = data.get('tool5Key', '').strip()
-            emote_wheel_key = data.get('emoteWheelKey', '').strip()
-            craft_menu_key = data.get('craftMenuKey', '').strip()
-            cozy_zoom_key = data.get('cozyZoomKey', '').strip()
-            chill_action_key = data.get('chillActionKey', '').strip()
-            gardening_key = data.get('gardeningKey', '').strip()
-            backpack_key = data.get('backpackKey', '').strip()
-            decor_mode_key = data.get('decorModeKey', '').strip()
-            cozy_slow_walk_key = data.get('cozySlowWalkKey', '').strip()
-            cozy_grid_toggle_key = data.get('cozyGridToggleKey', '').strip()
-            cozy_inspect_key = data.get('cozyInspectKey', '').strip()
-            pet_whistle_key = data.get('petWhistleKey', '').strip()
-
-            # Action combat
-            primary_attack_key = data.get('primaryAttackKey', '').strip()
-            heavy_attack_key = data.get('heavyAttackKey', '').strip()
-            ability1_key = data.get('ability1Key', '').strip()
-            ability2_key = data.get('ability2Key', '').strip()
-            ability3_key = data.get('ability3Key', '').strip()
-            ability4_key = data.get('ability4Key', '').strip()
-            ultimate_key = data.get('ultimateKey', '').strip()
-            dodge_key = data.get('dodgeKey', '').strip()
-            crouch_key = data.get('crouchKey', '').strip()
-            grenade_key = data.get('grenadeKey', '').strip()
-            reload_key = data.get('reloadKey', '').strip()
-            execute_key = data.get('executeKey', '').strip()
-            melee_key = data.get('meleeKey', '').strip()
-            weapon_swap_key = data.get('weaponSwapKey', '').strip()
-            mark_target_key = data.get('markTargetKey', '').strip()
-            focus_state_key = data.get('focusStateKey', '').strip()
-            lock_on_key = data.get('lockOnKey', '').strip()
-            tactical_wheel_key = data.get('tacticalWheelKey', '').strip()
-            taunt_key = data.get('tauntKey', '').strip()
+            user_github_id = (data.get('userGithubId') or '').strip()
+            game_mode = (data.get('gameMode') or 'action').strip() or 'action'
+            keys = _pluck(data, *KEYBIND_JSON_KEYS)
+            bindings = dict(zip(KEYBIND_JSON_KEYS, keys))
 
             # Validate required fields
             missing = []
             if not user_github_id: missing.append('userGithubId')
-            if not move_up_key: missing.append('moveUpKey')
-            if not move_left_key: missing.append('moveLeftKey')
-            if not move_down_key: missing.append('moveDownKey')
-            if not move_right_key: missing.append('moveRightKey')
-            if not interact_key: missing.append('interactKey')
-            if game_mode != 'cozy' and not jump_key:
-                missing.append('jumpKey')
+            for json_key in KEYBIND_REQUIRED_FIELDS:
+                if not bindings[json_key] and not (json_key == 'jumpKey' and game_mode == 'cozy'):
+                    missing.append(json_key)
 
             if missing:
                 return {'message': f'Missing required fields: {", ".join(missing)}'}, 400
 
-            db_path = get_rpg_db_path()
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-
-            # ✅ SAFE INSERT: column count always matches value count
-            columns = [
-                "user_github_id",
-                "game_mode",
-                "move_up_key",
-                "move_left_key",
-                "move_down_key",
-                "move_right_key",
-                "interact_key",
-                "jump_key",
-                "sprint_key",
-                "secondary_interact_key",
-                "quick_action_key",
-                "inventory_key",
-                "map_key",
-                "pause_key",
-                "quick_menu_key",
-                "screenshot_key",
-                "tool1_key",
-                "tool2_key",
-                "tool3_key",
-                "tool4_key",
-                "tool5_key",
-                "emote_wheel_key",
-                "craft_menu_key",
-                "cozy_zoom_key",
-                "chill_action_key",
-                "gardening_key",
-                "backpack_key",
-                "decor_mode_key",
-                "cozy_slow_walk_key",
-                "cozy_grid_toggle_key",
-                "cozy_inspect_key",
-                "pet_whistle_key",
-                "primary_attack_key",
-                "heavy_attack_key",
-                "ability1_key",
-                "ability2_key",
-                "ability3_key",
-                "ability4_key",
-                "ultimate_key",
-                "dodge_key",
-                "crouch_key",
-                "grenade_key",
-                "reload_key",
-                "execute_key",
-                "melee_key",
-                "weapon_swap_key",
-                "mark_target_key",
-                "focus_state_key",
-                "lock_on_key",
-                "tactical_wheel_key",
-                "taunt_key",
-            ]
+            too_long = [json_key for json_key, key in bindings.items() if len(key) > MAX_KEYBIND_LENGTH]
+            if too_long:
+                return {'message': f'Key bindings longer than {MAX_KEYBIND_LENGTH} characters: {", ".join(too_long)}'}, 400
 
-            values = [
-                user_github_id,
-                game_mode,
-                move_up_key,
-                move_left_key,
-                move_down_key,
-                move_right_key,
-                interact_key,
-                jump_key,
-                sprint_key or None,
-                secondary_interact_key or None,
-                quick_action_key or None,
-                inventory_key or None,
-                map_key or None,
-                pause_key or None,
-                quick_menu_key or None,
-                screenshot_key or None,
-                tool1_key or None,
-                tool2_key or None,
-                tool3_key or None,
-                tool4_key or None,
-                tool5_key or None,
-                emote_wheel_key or None,
-                craft_menu_key or None,
-                cozy_zoom_key or None,
-                chill_action_key or None,
-                gardening_key or None,
-                backpack_key or None,
-                decor_mode_key or None,
-                cozy_slow_walk_key or None,
-                cozy_grid_toggle_key or None,
-                cozy_inspect_key or None,
-                pet_whistle_key or None,
-                primary_attack_key or None,
-                heavy_attack_key or None,
-                ability1_key or None,
-                ability2_key or None,
-                ability3_key or None,
-                ability4_key or None,
-                ultimate_key or None,
-                dodge_key or None,
-                crouch_key or None,
-                grenade_key or None,
-                reload_key or None,
-                execute_key or None,
-                melee_key or None,
-                weapon_swap_key or None,
-                mark_target_key or None,
-                focus_state_key or None,
-                lock_on_key or None,
-                tactical_wheel_key or None,
-                taunt_key or None,
-            ]
-
-            placeholders = ", ".join(["?"] * len(columns))
-            sql = f"INSERT INTO key_bindings ({', '.join(columns)}) VALUES ({placeholders})"
-            cursor.execute(sql, values)
+            # Empty optional keys are stored as NULL
+            values = [user_github_id, game_mode]
+            values.extend(key if key or not nullable else None for key, nullable in zip(keys, _KEYBIND_NULLABLE))
 
-
-            binding_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            with get_rpg_pool().transaction() as conn:
+                binding_id = conn.execute(SQL_INS_KEYBIND, values).lastrowid
 
             return {
                 'id': binding_id,
                 'userGithubId': user_github_id,
                 'gameMode': game_mode,
-                'moveUpKey': move_up_key,
-                'moveLeftKey': move_left_key,
-                'moveDownKey': move_down_key,
-                'moveRightKey': move_right_key,
-                'interactKey': interact_key,
-                'jumpKey': jump_key,
-                'sprintKey': sprint_key,
-
-                'secondaryInteractKey': secondary_interact_key,
-                'quickActionKey': quick_action_key,
-                'inventoryKey': inventory_key,
-                'mapKey': map_key,
-                'pauseKey': pause_key,
-                'quickMenuKey': quick_menu_key,
-                'screenshotKey': screenshot_key,
-
-                'tool1Key': tool1_key,
-                'tool2Key': tool2_key,
-                'tool3Key': tool3_key,
-                'tool4Key': tool4_key,
-                'tool5Key': tool5_key,
-                'emoteWheelKey': emote_wheel_key,
-                'craftMenuKey': craft_menu_key,
-                'cozyZoomKey': cozy_zoom_key,
-                'chillActionKey': chill_action_key,
-                'gardeningKey': gardening_key,
-                'backpackKey': backpack_key,
-                'decorModeKey': decor_mode_key,
-                'cozySlowWalkKey': cozy_slow_walk_key,
-                'cozyGridToggleKey': cozy_grid_toggle_key,
-                'cozyInspectKey': cozy_inspect_key,
-                'petWhistleKey': pet_whistle_key,
-
-                'primaryAttackKey': primary_attack_key,
-                'heavyAttackKey': heavy_attack_key,
-                'ability1Key': ability1_key,
-                'ability2Key': ability2_key,
-                'ability3Key': ability3_key,
-                'ability4Key': ability4_key,
-                'ultimateKey': ultimate_key,
-                'dodgeKey': dodge_key,
-                'crouchKey': crouch_key,
-                'grenadeKey': grenade_key,
-                'reloadKey': reload_key,
-                'executeKey': execute_key,
-                'meleeKey': melee_key,
-                'weaponSwapKey': weapon_swap_key,
-                'markTargetKey': mark_target_key,
-                'focusStateKey': focus_state_key,
-                'lockOnKey': lock_on_key,
-                'tacticalWheelKey': tactical_wheel_key,
-                'tauntKey': taunt_key
+                **bindings
             }, 201
 
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {'message': f'Error saving key bindings: {str(e)}'}, 500
 
@@ -910,91 +1406,21 @@ class KeyBindingAPI(Resource):
             if not user_github_id:
                 return {'message': 'User GitHub ID is required'}, 400
 
-            db_path = get_rpg_db_path()
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with get_rpg_pool().reader() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = None
 
-            if game_mode:
-                cursor.execute('''
-                    SELECT * FROM key_bindings
-                    WHERE user_github_id = ? AND game_mode = ?
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                ''', (user_github_id, game_mode))
-            else:
-                cursor.execute('''
-                    SELECT * FROM key_bindings
-                    WHERE user_github_id = ?
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                ''', (user_github_id,))
+                if game_mode:
+                    cursor.execute(SQL_GET_KEYBIND_MODE, (user_github_id, game_mode))
+                else:
+                    cursor.execute(SQL_GET_KEYBIND_LATEST, (user_github_id,))
 
-            row = cursor.fetchone()
-            conn.close()
+                row = cursor.fetchone()
 
             if not row:
                 return {'message': 'No key bindings found for this user'}, 404
 
-            binding = {
-                'id': row['id'],
-                'userGithubId': row['user_github_id'],
-                'gameMode': row['game_mode'],
-
-                'moveUpKey': row['move_up_key'],
-                'moveLeftKey': row['move_left_key'],
-                'moveDownKey': row['move_down_key'],
-                'moveRightKey': row['move_right_key'],
-                'interactKey': row['interact_key'],
-                'jumpKey': row['jump_key'],
-                'sprintKey': row['sprint_key'],
-
-                'secondaryInteractKey': row['secondary_interact_key'],
-                'quickActionKey': row['quick_action_key'],
-                'inventoryKey': row['inventory_key'],
-                'mapKey': row['map_key'],
-                'pauseKey': row['pause_key'],
-                'quickMenuKey': row['quick_menu_key'],
-                'screenshotKey': row['screenshot_key'],
-
-                'tool1Key': row['tool1_key'],
-                'tool2Key': row['tool2_key'],
-                'tool3Key': row['tool3_key'],
-                'tool4Key': row['tool4_key'],
-                'tool5Key': row['tool5_key'],
-                'emoteWheelKey': row['emote_wheel_key'],
-                'craftMenuKey': row['craft_menu_key'],
-                'cozyZoomKey': row['cozy_zoom_key'],
-                'chillActionKey': row['chill_action_key'],
-                'gardeningKey': row['gardening_key'],
-                'backpackKey': row['backpack_key'],
-                'decorModeKey': row['decor_mode_key'],
-                'cozySlowWalkKey': row['cozy_slow_walk_key'],
-                'cozyGridToggleKey': row['cozy_grid_toggle_key'],
-                'cozyInspectKey': row['cozy_inspect_key'],
-                'petWhistleKey': row['pet_whistle_key'],
-
-                'primaryAttackKey': row['primary_attack_key'],
-                'heavyAttackKey': row['heavy_attack_key'],
-                'ability1Key': row['ability1_key'],
-                'ability2Key': row['ability2_key'],
-                'ability3Key': row['ability3_key'],
-                'ability4Key': row['ability4_key'],
-                'ultimateKey': row['ultimate_key'],
-                'dodgeKey': row['dodge_key'],
-                'crouchKey': row['crouch_key'],
-                'grenadeKey': row['grenade_key'],
-                'reloadKey': row['reload_key'],
-                'executeKey': row['execute_key'],
-                'meleeKey': row['melee_key'],
-                'weaponSwapKey': row['weapon_swap_key'],
-                'markTargetKey': row['mark_target_key'],
-                'focusStateKey': row['focus_state_key'],
-                'lockOnKey': row['lock_on_key'],
-                'tacticalWheelKey': row['tactical_wheel_key'],
-                'tauntKey': row['taunt_key'],
-                'createdAt': row['created_at']
-            }
+            binding = dict(zip(KEYBIND_RESPONSE_KEYS, row))
 
             return {'binding': binding}, 200
 
@@ -1032,26 +1458,20 @@ class GameSystemsAPI(Resource):
                 systems.pop('gameMode', None)
 
             # Ensure JSON serialization
-            import json
             systems_json = json.dumps(systems)
 
-            db_path = get_rpg_db_path()
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT INTO systems (user_github_id, game_mode, systems_json)
-                VALUES (?, ?, ?)
-                ON CONFLICT(user_github_id, game_mode)
-                DO UPDATE SET
-                    systems_json = excluded.systems_json,
-                    created_at = CURRENT_TIMESTAMP
-            ''', (user_github_id, game_mode, systems_json))
-
-
-            systems_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            # RETURNING gives the row id on both the insert and the update path;
+            # lastrowid is connection-wide and stale after an upsert-update on a pooled connection
+            with get_rpg_pool().transaction() as conn:
+                systems_id = conn.execute('''
+                    INSERT INTO systems (user_github_id, game_mode, systems_json)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(user_github_id, game_mode)
+                    DO UPDATE SET
+                        systems_json = excluded.systems_json,
+                        created_at = CURRENT_TIMESTAMP
+                    RETURNING id
+                ''', (user_github_id, game_mode, systems_json)).fetchone()[0]
 
             return {
                 'id': systems_id,
@@ -1061,7 +1481,6 @@ class GameSystemsAPI(Resource):
             }, 201
 
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {'message': f'Error saving game systems: {str(e)}'}, 500
 
@@ -1073,33 +1492,29 @@ class GameSystemsAPI(Resource):
             if not user_github_id:
                 return {'message': 'User GitHub ID is required'}, 400
 
-            db_path = get_rpg_db_path()
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            if game_mode:
-                cursor.execute('''
-                    SELECT * FROM systems
-                    WHERE user_github_id = ? AND game_mode = ?
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                ''', (user_github_id, game_mode))
-            else:
-                cursor.execute('''
-                    SELECT * FROM systems
-                    WHERE user_github_id = ?
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                ''', (user_github_id,))
-
-            row = cursor.fetchone()
-            conn.close()
+            with get_rpg_pool().reader() as conn:
+                cursor = conn.cursor()
+
+                if game_mode:
+                    cursor.execute('''
+                        SELECT * FROM systems
+                        WHERE user_github_id = ? AND game_mode = ?
+                        ORDER BY created_at DESC
+                        LIMIT 1
+                    ''', (user_github_id, game_mode))
+                else:
+                    cursor.execute('''
+                        SELECT * FROM systems
+                        WHERE user_github_id = ?
+                        ORDER BY created_at DESC
+                        LIMIT 1
+                    ''', (user_github_id,))
+
+                row = cursor.fetchone()
 
             if not row:
                 return {'message': 'No game systems found for this user'}, 404
 
-            import json
             systems = json.loads(row['systems_json'])
 
             return {
@@ -1120,14 +1535,48 @@ class GameSystemsAPI(Resource):
 # STORY ELEMENTS API RESOURCES
 # ============================================================================
 
+# Encoded /api/rpg/story body; rebuilt only when story_elements.json changes
+_story_body_cache = None  # (file signature, JSON bytes, etag)
+
+def _story_file_signature():
+    path = get_story_file()
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return (path, None)
+    return (path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+def invalidate_story_body():
+    """Drop the cached list (votes can land within the file's mtime granularity)"""
+    global _story_body_cache
+    _story_body_cache = None
+
+def story_elements_body():
+    """(JSON bytes, etag) for the full story element list"""
+    global _story_body_cache
+    signature = _story_file_signature()
+    cached = _story_body_cache
+    if cached is None or cached[0] != signature:
+        body = current_app.json.dumps(getStoryElements()).encode('utf-8')
+        cached = _story_body_cache = (signature, body, hashlib.blake2b(body, digest_size=8).hexdigest())
+    return cached[1], cached[2]
+
 class StoryElementsAPI(Resource):
     """Story elements browsing
 
     Frontend: in-game story UI that shows story elements for players.
     Endpoint: `/api/rpg/story`.
+    Unchanged lists are served from the cached encoding, or as a 304 when the
+    client's If-None-Match still matches.
     """
     def get(self):
-        return jsonify(getStoryElements())
+        body, etag = story_elements_body()
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response
 
 class StoryElementAPI(Resource):
     """Get a specific story element by ID"""
@@ -1137,14 +1586,46 @@ class StoryElementAPI(Resource):
 class StoryLoveAPI(Resource):
     """Increment love count for a story element"""
     def put(self, id):
-        addStoryLove(id)
-        return jsonify(getStoryElement(id))
+        # The vote already has the updated element; no second file read
+        element = addStoryLove(id)
+        invalidate_story_body()
+        return jsonify(element)
 
 class StorySkipAPI(Resource):
     """Increment skip count for a story element"""
     def put(self, id):
-        addStorySkip(id)
-        return jsonify(getStoryElement(id))
+        element = addStorySkip(id)
+        invalidate_story_body()
+        return jsonify(element)
+
+STORY_VOTES_MAX = 100
+
+class StoryVotesAPI(Resource):
+    """Apply several love/skip votes in one request
+
+    Frontend: story UI flushing votes the player made in quick succession.
+    Endpoint: `/api/rpg/story/votes`.
+
+    Body JSON:
+      [{"id": 3, "field": "love"}, {"id": 7, "field": "skip"}, ...]
+    Returns {"elements": [...]} with the updated element (or null for an unknown id) per vote.
+    """
+    def post(self):
+        items = request.get_json(silent=True)
+        if not isinstance(items, list) or not items:
+            return {'message': 'Body must be a non-empty JSON list of votes'}, 400
+        if len(items) > STORY_VOTES_MAX:
+            return {'message': f'At most {STORY_VOTES_MAX} votes per batch'}, 400
+        votes = []
+        for index, item in enumerate(items):
+            id = item.get('id') if isinstance(item, dict) else None
+            field = item.get('field') if isinstance(item, dict) else None
+            if type(id) is not int or field not in ('love', 'skip'):
+                return {'message': f'Vote {index} needs an integer id and field "love" or "skip"'}, 400
+            votes.append((id, field))
+        elements = apply_votes(votes)
+        invalidate_story_body()
+        return jsonify({'elements': elements})
 
 class StorySummaryAPI(Resource):
     """Aggregate love/skip counts overall and by category"""
@@ -1162,6 +1643,48 @@ class StorySummaryAPI(Resource):
             bucket['skip'] += skip
         return jsonify(totals)
 
+# --- API Resource: Batched reads ---
+BATCH_MAX_REQUESTS = 20
+
+class RPGBatchAPI(Resource):
+    """Batched GETs
+
+    Frontend: game screen load, which otherwise fetches character, quests,
+    key bindings, systems and story one request at a time.
+    Endpoint: `/api/rpg/batch`.
+
+    Body JSON:
+      ["/api/rpg/character?userGithubId=x", "/api/rpg/quests?userGithubId=x", ...]
+    Returns { path: {"status": int, "body": json} } for each path.
+    """
+    def post(self):
+        paths = request.get_json(silent=True)
+        if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+            return {'message': 'Body must be a JSON list of GET paths'}, 400
+        if len(paths) > BATCH_MAX_REQUESTS:
+            return {'message': f'At most {BATCH_MAX_REQUESTS} paths per batch'}, 400
+
+        app = current_app._get_current_object()
+        results = {}
+        for path in paths:
+            # Read-only RPG endpoints only; no nesting batches inside batches
+            if not path.startswith('/api/rpg/') or path.split('?', 1)[0].rstrip('/') == '/api/rpg/batch':
+                results[path] = {'status': 400, 'body': {'message': 'Only GET /api/rpg/ paths can be batched'}}
+                continue
+            # Dispatched in-process: same hooks and views, no extra HTTP round trip
+            with app.test_request_context(path, method='GET'):
+                response = app.full_dispatch_request()
+            if response.is_json:
+                body = response.get_json()
+            elif response.status_code >= 400:
+                # e.g. the HTML 404 page: just say what went wrong
+                body = {'message': HTTP_STATUS_CODES.get(response.status_code, 'Error')}
+            else:
+                body = response.get_data(as_text=True)
+            results[path] = {'status': response.status_code, 'body': body}
+        return results, 200
+
+
 # ============================================================================
 # REGISTER API ENDPOINTS
 # ============================================================================
@@ -1171,6 +1694,8 @@ api.add_resource(RPGDataAPI, '/api/rpg/data')
 api.add_resource(RPGLoginAPI, '/api/rpg/login')
 # Character and Quest endpoints
 api.add_resource(CharacterAPI, '/api/rpg/character')
+api.add_resource(CharacterBatchAPI, '/api/rpg/character/batch')
+api.add_resource(CharacterAnalysisJobAPI, '/api/rpg/character/analysis/<string:job_id>')
 api.add_resource(QuestAPI, '/api/rpg/quest', '/api/rpg/quests')
 api.add_resource(KeyBindingAPI, '/api/rpg/keybindings')
 
@@ -1179,14 +1704,16 @@ api.add_resource(StoryElementsAPI, '/api/rpg/story', '/api/rpg/story/')
 api.add_resource(StoryElementAPI, '/api/rpg/story/<int:id>', '/api/rpg/story/<int:id>/')
 api.add_resource(StoryLoveAPI, '/api/rpg/story/love/<int:id>', '/api/rpg/story/love/<int:id>/')
 api.add_resource(StorySkipAPI, '/api/rpg/story/skip/<int:id>', '/api/rpg/story/skip/<int:id>/')
+api.add_resource(StoryVotesAPI, '/api/rpg/story/votes', '/api/rpg/story/votes/')
 api.add_resource(StorySummaryAPI, '/api/rpg/story/summary', '/api/rpg/story/summary/')
 
 api.add_resource(GameSystemsAPI, '/api/rpg/systems')
 
+api.add_resource(RPGBatchAPI, '/api/rpg/batch')
+
 # HTML endpoint for testing
-@rpg_api.route('/rpg')
-def rpg_home():
-    html_content = """
+# Static page, encoded once at import
+RPG_HOME_HTML = """
     <html>
     <head>
         <title>RPG Game Backend</title>
@@ -1261,27 +1788,64 @@ def rpg_home():
     </body>
     </html>
     """
-    return html_content
+_RPG_HOME_BYTES = RPG_HOME_HTML.encode('utf-8')
+_RPG_HOME_ETAG = hashlib.blake2b(_RPG_HOME_BYTES, digest_size=8).hexdigest()
+
+@rpg_api.route('/rpg')
+def rpg_home():
+    # Repeat visitors revalidate with If-None-Match and get an empty 304
+    if request.if_none_match.contains(_RPG_HOME_ETAG):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(_RPG_HOME_BYTES, mimetype='text/html')
+    response.set_etag(_RPG_HOME_ETAG)
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
 
 # --- RPG Statistics (updated schema + POST-only legacy record) ---
 DATABASE = os.path.join('instance', 'rpg', 'rpg_statistics.db')
 
-os.makedirs(os.path.dirname(DATABASE), exist_ok=True)
-
-@contextmanager
-def get_db():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+# Number of most recent selections returned as `history`
+HISTORY_LIMIT = 100
+VALID_MODES = frozenset(('chill', 'action'))
+# Longest accepted userGithubId (GitHub usernames top out at 39 characters)
+MAX_USER_ID_LENGTH = 64
+# Rows kept in user_mode; older ones are trimmed by the trim_user_mode trigger
+HISTORY_RETAIN = 10000
+
+# Statement text is kept identical across calls so the per-connection statement cache hits
+SQL_GET_STATS = 'SELECT mode, count FROM mode_stats'
+# `id` is the rowid, so this walks the table b-tree backwards and stops after
+# HISTORY_LIMIT rows -- no sort step and no extra index needed
+SQL_GET_HISTORY = f'SELECT user_github_id, mode FROM user_mode ORDER BY id DESC LIMIT {HISTORY_LIMIT}'
+SQL_INS_HISTORY = 'INSERT INTO user_mode (user_github_id, mode) VALUES (?, ?)'
+SQL_ADD_COUNT = 'UPDATE mode_stats SET count = count + ? WHERE mode = ?'
+SQL_RESET_COUNT = 'UPDATE mode_stats SET count = 0'
+SQL_DEL_HIST = 'DELETE FROM user_mode'
+
+_stats_pool = SQLitePool(DATABASE)
+
+def get_db(write=False):
+    """Borrow a pooled stats connection; write=True serializes on the writer lock"""
+    return _stats_pool.writer() if write else _stats_pool.connection()
 
 def init_rpg_stats():
     """Initialize RPG statistics database (mode_stats + user_mode, no timestamp)"""
-    with get_db() as conn:
+    if not _claim_init(DATABASE):
+        return
+    if _is_file_db(DATABASE):
+        os.makedirs(os.path.dirname(DATABASE), exist_ok=True)
+
+    with get_db(write=True) as conn:
+        # WAL lets readers run alongside the writer; the mode sticks to the db file
+        if _is_file_db(DATABASE):
+            conn.execute('PRAGMA journal_mode=WAL')
+
         cursor = conn.cursor()
 
+        # Schema + seed go in as one transaction: one commit, no half-initialized db
+        cursor.execute('BEGIN IMMEDIATE')
+
         # NEW TABLE: mode_stats (was statistics)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS mode_stats (
@@ -1300,54 +1864,192 @@ def init_rpg_stats():
             )
         ''')
 
+        # Only the newest rows are ever read, so cap the table instead of letting
+        # it (and the WAL/page cache work that comes with it) grow forever.
+        # Recreated each start so a changed HISTORY_RETAIN takes effect.
+        cursor.execute('DROP TRIGGER IF EXISTS trim_user_mode')
+        cursor.execute(f'''
+            CREATE TRIGGER trim_user_mode AFTER INSERT ON user_mode
+            BEGIN
+                DELETE FROM user_mode WHERE id <= NEW.id - {HISTORY_RETAIN};
+            END
+        ''')
+
         cursor.execute('SELECT COUNT(*) FROM mode_stats')
         if cursor.fetchone()[0] == 0:
-            cursor.execute('INSERT INTO mode_stats (mode, count) VALUES (?, ?)', ('chill', 0))
-            cursor.execute('INSERT INTO mode_stats (mode, count) VALUES (?, ?)', ('action', 0))
+            cursor.executemany('INSERT INTO mode_stats (mode, count) VALUES (?, 0)', [('chill',), ('action',)])
             print('✓ RPG Statistics database initialized (mode_stats/user_mode)')
         conn.commit()
 
-def get_statistics():
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT mode, count FROM mode_stats')
-        stats_rows = cursor.fetchall()
-
-        stats = {'chill': 0, 'action': 0, 'total': 0}
-        for row in stats_rows:
-            mode = row['mode']
-            count = row['count']
-            stats[mode] = count
-            stats['total'] += count
-
-        cursor.execute('''
-            SELECT user_github_id, mode
-            FROM user_mode
-            ORDER BY id DESC
-            LIMIT 100
-        ''')
-        history_rows = cursor.fetchall()
-
+    load_selection_state()
+
+# --- In-memory selection state + buffered writes ---
+# Counts and the most recent history are kept in memory (loaded once from the
+# database) so reads and record/reset responses never query SQLite. New
+# selections are queued and written as one transaction per batch (every
+# FLUSH_INTERVAL seconds, or as soon as FLUSH_THRESHOLD rows are waiting).
+# _selection_lock is held across a flush so a reset can't interleave with it.
+FLUSH_INTERVAL = 0.2
+FLUSH_THRESHOLD = 50
+
+_counts = {'chill': 0, 'action': 0}
+_recent = deque(maxlen=HISTORY_LIMIT)  # newest first
+_pending = deque()
+_selection_lock = threading.Lock()
+_flush_timer = None
+
+def load_selection_state():
+    """Load counts and the latest history from the database into memory"""
+    with _selection_lock:
+        with get_db() as conn:
+            # Plain tuples: rows are unpacked positionally, no sqlite3.Row name lookups
+            cursor = conn.cursor()
+            cursor.row_factory = None
+
+            cursor.execute(SQL_GET_STATS)
+            stats_rows = cursor.fetchall()
+
+            cursor.execute(SQL_GET_HISTORY)
+            history_rows = cursor.fetchall()
+
+        _counts.clear()
+        _counts.update({'chill': 0, 'action': 0})
+        _counts.update(stats_rows)
+        _recent.clear()
+        _recent.extend(history_rows)
+        # Selections not flushed yet are already part of the in-memory view
+        for user_github_id, mode in _pending:
+            _counts[mode] += 1
+            _recent.appendleft((user_github_id, mode))
+
+def queue_selection(user_github_id, mode):
+    """Record one selection in memory; the database write happens in the next flush"""
+    global _flush_timer
+    with _selection_lock:
+        _counts[mode] += 1
+        _recent.appendleft((user_github_id, mode))
+        _pending.append((user_github_id, mode))
+        flush_now = len(_pending) >= FLUSH_THRESHOLD
+        if not flush_now and _flush_timer is None:
+            _flush_timer = threading.Timer(FLUSH_INTERVAL, flush_selections)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+    if flush_now:
+        flush_selections()
+
+def flush_selections():
+    """Write all buffered selections in a single BEGIN IMMEDIATE ... COMMIT"""
+    global _flush_timer
+    with _selection_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        if not _pending:
+            return
+        rows = list(_pending)
+        counts = Counter(mode for _, mode in rows)
+        try:
+            with get_db(write=True) as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(SQL_INS_HISTORY, rows)
+                conn.executemany(SQL_ADD_COUNT, [(n, mode) for mode, n in counts.items()])
+                conn.commit()
+        except Exception as e:
+            # Rows stay buffered and go out with the next flush
+            print(f'❌ Failed to flush RPG selections: {e}')
+            return
+        _pending.clear()
+
+# Don't lose the last batch when the process exits
+atexit.register(flush_selections)
+
+def reset_selections():
+    """Zero all counts and drop the history, in memory and in the database"""
+    with _selection_lock:
+        _pending.clear()
+        with get_db(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(SQL_RESET_COUNT)
+            cursor.execute(SQL_DEL_HIST)
+            conn.commit()
+        for mode in _counts:
+            _counts[mode] = 0
+        _recent.clear()
+
+def get_statistics(compact=False):
+    """Current counts and history; compact=True sends history as [userGithubId, mode] pairs"""
+    with _selection_lock:
+        stats = dict(_counts)
+        history = list(_recent)
+
+    stats['total'] = sum(stats.values())
+    if compact:
+        stats['history'] = history
+    else:
         stats['history'] = [
-            {
-                'userGithubId': row['user_github_id'],
-                'mode': row['mode']
-            }
-            for row in history_rows
+            {'userGithubId': user_github_id, 'mode': mode}
+            for user_github_id, mode in history
         ]
 
-        return stats
+    return stats
+
+# --- Serialized stats cache ---
+# The encoded /api/rpg_stats body is kept until the next write invalidates it.
+# _stats_version changes on every write so a body built from older data is never stored.
+# It doubles as the ETag, prefixed with a per-process token so a restart can't
+# answer 304 to a tag handed out before it.
+_stats_cache = {}  # compact flag -> encoded body
+_stats_version = 0
+_stats_lock = threading.Lock()
+_stats_epoch = os.urandom(4).hex()
+
+def stats_etag(version, compact=False):
+    return f'{_stats_epoch}-{version}{"c" if compact else ""}'
+
+def invalidate_stats_cache():
+    global _stats_version
+    with _stats_lock:
+        _stats_version += 1
+        _stats_cache.clear()
+
+def wants_compact_stats():
+    """?compact=1 asks for history as [userGithubId, mode] arrays instead of objects"""
+    return request.args.get('compact', '').lower() in ('1', 'true')
+
+def stats_response(compact=False):
+    """JSON response for the current statistics, served from the cache when possible"""
+    with _stats_lock:
+        body = _stats_cache.get(compact)
+        version = _stats_version
+    if body is None:
+        body = jsonify(get_statistics(compact)).get_data()
+        with _stats_lock:
+            if version == _stats_version:
+                _stats_cache[compact] = body
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(stats_etag(version, compact), weak=True)
+    return response
 
 
 # --- Legacy `/api/stats` endpoints ---
 
 @rpg_api.route('/api/rpg_stats', methods=['GET'])
 def get_stats_legacy():
-    """GET /api/stats - return statistics (legacy route)"""
+    """GET /api/stats - return statistics (legacy route)
+
+    Sends a weak ETag; a matching If-None-Match gets an empty 304.
+    ?compact=1 returns history as [userGithubId, mode] arrays.
+    """
     try:
-        stats = get_statistics()
-        return jsonify(stats)
+        compact = wants_compact_stats()
+        with _stats_lock:
+            etag = stats_etag(_stats_version, compact)
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        return stats_response(compact)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1364,27 +2066,15 @@ def record_selection_legacy():
         mode = (data.get('mode') or '').strip()
         user_github_id = (data.get('userGithubId') or 'anonymous').strip() or 'anonymous'
 
-        if mode not in ['chill', 'action']:
+        if mode not in VALID_MODES:
             return jsonify({'error': 'Invalid mode'}), 400
+        if len(user_github_id) > MAX_USER_ID_LENGTH:
+            return jsonify({'error': 'userGithubId too long'}), 400
 
-        with get_db() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                UPDATE mode_stats
-                SET count = count + 1
-                WHERE mode = ?
-            ''', (mode,))
-
-            cursor.execute('''
-                INSERT INTO user_mode (user_github_id, mode)
-                VALUES (?, ?)
-            ''', (user_github_id, mode))
+        queue_selection(user_github_id, mode)
+        invalidate_stats_cache()
 
-            conn.commit()
-
-        stats = get_statistics()
-        return jsonify(stats)
+        return stats_response(wants_compact_stats())
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1393,14 +2083,10 @@ def record_selection_legacy():
 def reset_stats_legacy():
     """Reset statistics (legacy route)"""
     try:
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute('UPDATE mode_stats SET count = 0')
-            cursor.execute('DELETE FROM user_mode')
-            conn.commit()
+        reset_selections()
+        invalidate_stats_cache()
 
-        stats = get_statistics()
-        return jsonify(stats)
+        return stats_response(wants_compact_stats())
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1410,5 +2096,3 @@ def stats_health_legacy():
     """Legacy health check for /api/stats"""
     return jsonify({'status': 'healthy', 'database': DATABASE})
 
-# Initialize the stats DB on module load
-init_rpg_stats()
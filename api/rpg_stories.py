@@ -2,7 +2,10 @@
 # This file handles story element data storage and voting (love/skip counts)
 # Updated to limit each category to 5 items
 
-import random, json, os, fcntl
+import random, os, fcntl, threading, atexit, functools, uuid
+from contextlib import contextmanager
+from collections import Counter
+import orjson
 from flask import current_app
 
 # ============================================================================
@@ -53,36 +56,110 @@ story_data_initial = {
     ]
 }
 
+# Flattened once at import: the initial elements with their ids and zero counts
+_INITIAL_ELEMENTS = tuple(
+    {"id": item_id, "category": category, "element": element_text, "love": 0, "skip": 0}
+    for item_id, (category, element_text) in enumerate(
+        (category, element_text)
+        for category, elements in story_data_initial.items()
+        for element_text in elements
+    )
+)
+
 # ============================================================================
 # FILE MANAGEMENT FUNCTIONS
 # ============================================================================
 
+@functools.lru_cache(maxsize=4)
+def _story_file_path(data_folder):
+    return os.path.join(data_folder, 'story_elements.json')
+
 def get_story_file():
     """Get the path to the story elements JSON file"""
-    data_folder = current_app.config['DATA_FOLDER']
-    return os.path.join(data_folder, 'story_elements.json')
+    return _story_file_path(current_app.config['DATA_FOLDER'])
+
+# Parsed story elements, reused until the file changes on disk.
+# Keyed by (path, inode, mtime, size); writes from this process refresh it directly.
+_story_cache = {'key': None, 'data': None}
+_story_cache_lock = threading.Lock()
+
+def _story_file_key(path):
+    """Identity of the file's current contents, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _cache_story_data(path, data):
+    """Remember `data` as the contents just written to `path`"""
+    with _story_cache_lock:
+        _story_cache['key'] = _story_file_key(path)
+        _story_cache['data'] = data
+
+def _load_story_file(path):
+    """(elements, vote log marker) from the file; older files are a bare list with no marker"""
+    with open(path, 'rb') as f:
+        data = orjson.loads(f.read())
+    if isinstance(data, dict):
+        return data['elements'], data.get('voteLog')
+    return data, None
 
 def _read_story_file():
-    """Read story elements from JSON file with file locking"""
+    """Read story elements from JSON file (cached while unchanged)
+
+    Writers replace the file atomically, so a read never sees a partial file and
+    needs no lock. The returned list is shared with the cache; treat it as read-only.
+    """
     STORY_FILE = get_story_file()
-    if not os.path.exists(STORY_FILE):
+    key = _story_file_key(STORY_FILE)
+    if key is None:
         return []
-    with open(STORY_FILE, 'r') as f:
-        fcntl.flock(f, fcntl.LOCK_SH)
-        try:
-            data = json.load(f)
-        except Exception:
-            data = []
-        fcntl.flock(f, fcntl.LOCK_UN)
+    with _story_cache_lock:
+        if _story_cache['key'] == key:
+            return _story_cache['data']
+    try:
+        data, _ = _load_story_file(STORY_FILE)
+    except Exception:
+        data = []
+    # Stored under the pre-read key: if the file changed meanwhile, the next call re-reads
+    with _story_cache_lock:
+        _story_cache['key'] = key
+        _story_cache['data'] = data
     return data
 
+@contextmanager
+def _story_write_lock(path):
+    """Exclusive lock serializing writers across processes
+
+    Held on a separate lock file: os.replace swaps the story file's inode, so a
+    lock on the story file itself would not cover the next writer.
+    """
+    with open(path + '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _replace_story_file(path, data, vote_log=None):
+    """Write `data` to a temp file and rename it over `path` (call under _story_write_lock)
+
+    `vote_log` is the [log token, byte offset] of the vote log already counted in `data`.
+    """
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(orjson.dumps({'voteLog': vote_log, 'elements': data}))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _cache_story_data(path, data)
+
 def _write_story_file(data):
-    """Write story elements to JSON file with file locking"""
+    """Write story elements to JSON file, replacing it atomically"""
     STORY_FILE = get_story_file()
-    with open(STORY_FILE, 'w') as f:
-        fcntl.flock(f, fcntl.LOCK_EX)
-        json.dump(data, f, indent=2)
-        fcntl.flock(f, fcntl.LOCK_UN)
+    with _story_write_lock(STORY_FILE):
+        _replace_story_file(STORY_FILE, data)
 
 # ============================================================================
 # INITIALIZATION
@@ -93,28 +170,22 @@ def initStoryElements():
     STORY_FILE = get_story_file()
     # Only initialize if file does not exist
     if os.path.exists(STORY_FILE):
+        # Replay votes a previous run logged but never checkpointed
+        try:
+            _checkpoint_votes(STORY_FILE)
+        except Exception as e:
+            # The votes stay in the log for the next checkpoint
+            print(f'❌ Failed to replay story votes for {STORY_FILE}: {e}')
         return
     
-    story_data = []
-    item_id = 0
-    for category, elements in story_data_initial.items():
-        for element_text in elements:
-            story_data.append({
-                "id": item_id,
-                "category": category,
-                "element": element_text,
-                "love": 0,
-                "skip": 0
-            })
-            item_id += 1
+    story_data = [dict(elem) for elem in _INITIAL_ELEMENTS]
     
-    # Prime some love/skip responses for initial data
-    for i in range(10):
-        id = random.randint(0, len(story_data) - 1)
-        story_data[id]['love'] += 1
-    for i in range(5):
-        id = random.randint(0, len(story_data) - 1)
-        story_data[id]['skip'] += 1
+    # Prime some love/skip responses for initial data (10 loves, 5 skips at random)
+    ids = range(len(story_data))
+    for id, n in Counter(random.choices(ids, k=10)).items():
+        story_data[id]['love'] += n
+    for id, n in Counter(random.choices(ids, k=5)).items():
+        story_data[id]['skip'] += n
     
     _write_story_file(story_data)
 
@@ -163,30 +234,142 @@ def getMostSkippedElement():
 # VOTING FUNCTIONS
 # ============================================================================
 
-def _vote_story(id, field):
-    """Internal function to increment love or skip count"""
+# Each vote is counted in memory and appended as one "id,field" line to a log next to
+# the story file; the log is folded into the JSON (a checkpoint) once per
+# VOTE_FLUSH_INTERVAL or VOTE_FLUSH_THRESHOLD votes instead of one rewrite per click.
+# Votes in the log survive a crash and are replayed at the next checkpoint.
+VOTE_FLUSH_INTERVAL = 0.5  # seconds
+VOTE_FLUSH_THRESHOLD = 100
+
+_pending_votes = Counter()  # story file -> votes logged here since its last checkpoint
+_vote_lock = threading.Lock()
+_vote_timer = None
+
+def _vote_log(path):
+    """Path of the append-only vote log for a story file"""
+    return os.path.splitext(path)[0] + '.log'
+
+def _log_votes(path, votes):
+    """Append votes to the log in a single O_APPEND write, so lines never interleave"""
+    log_path = _vote_log(path)
+    while True:
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # Shared with other voters, exclusive against a checkpoint replacing the log
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            # A checkpoint may have swapped in a new log while we waited; append to that one
+            if os.fstat(fd).st_ino != os.stat(log_path).st_ino:
+                continue
+            os.write(fd, ''.join(f'{id},{field}\n' for id, field in votes).encode())
+            return
+        finally:
+            os.close(fd)
+
+def apply_votes(votes):
+    """Apply (id, field) increments together; returns the updated element (or None) for each
+
+    One lock, one log append and one copy of the cached list for the whole batch.
+    """
+    global _vote_timer
     STORY_FILE = get_story_file()
-    with open(STORY_FILE, 'r+') as f:
-        fcntl.flock(f, fcntl.LOCK_EX)
-        elements = json.load(f)
-        if 0 <= id < len(elements):
-            elements[id][field] += 1
-            # Move file pointer to start before writing updated JSON
-            f.seek(0)
-            json.dump(elements, f, indent=2)
-            # Truncate file to remove any leftover data from previous content
-            f.truncate()
-            fcntl.flock(f, fcntl.LOCK_UN)
-            return elements[id][field]
-        fcntl.flock(f, fcntl.LOCK_UN)
-    return None
+    with _vote_lock:
+        elements = _read_story_file()
+        valid = [(id, field) for id, field in votes if 0 <= id < len(elements)]
+        if not valid:
+            return [None] * len(votes)
+        _log_votes(STORY_FILE, valid)
+        # Copy-on-write: readers holding the cached list never see it change
+        elements = list(elements)
+        for id, field in valid:
+            element = dict(elements[id])
+            element[field] += 1
+            elements[id] = element
+        with _story_cache_lock:
+            # The file itself is unchanged until the checkpoint, so its key still applies
+            _story_cache['data'] = elements
+
+        _pending_votes[STORY_FILE] += len(valid)
+        flush_now = sum(_pending_votes.values()) >= VOTE_FLUSH_THRESHOLD
+        if not flush_now and _vote_timer is None:
+            _vote_timer = threading.Timer(VOTE_FLUSH_INTERVAL, flush_votes)
+            _vote_timer.daemon = True
+            _vote_timer.start()
+    if flush_now:
+        flush_votes()
+    return [elements[id] if 0 <= id < len(elements) else None for id, _ in votes]
+
+def _vote_story(id, field):
+    """Internal function to increment love or skip count; returns the updated element"""
+    return apply_votes([(id, field)])[0]
+
+def _parse_vote(line):
+    """(id, field) from a log line, or None for a line that doesn't parse"""
+    id, _, field = line.partition(b',')
+    if field not in (b'love', b'skip'):
+        return None
+    try:
+        return int(id), field.decode()
+    except ValueError:
+        return None
+
+def _checkpoint_votes(path):
+    """Fold the vote log into the story file and start a fresh log
+
+    Each log starts with a "#token" line, and the story file records the token and
+    byte offset it has counted up to. A crash between writing the story file and
+    replacing the log therefore can't count the same votes twice on replay.
+    """
+    log_path = _vote_log(path)
+    if not os.path.exists(log_path):
+        return
+    with _story_write_lock(path), open(log_path, 'rb') as log:
+        fcntl.flock(log, fcntl.LOCK_EX)
+        content = log.read()
+        token, start = '', 0
+        if content.startswith(b'#'):
+            header = content.split(b'\n', 1)[0]
+            token, start = header[1:].decode(), len(header) + 1
+        elements, marker = _load_story_file(path)
+        if marker is not None and marker[0] == token and start <= marker[1] <= len(content):
+            start = marker[1]
+        votes = [vote for vote in map(_parse_vote, content[start:].split()) if vote is not None]
+        if not votes:
+            return
+        for id, field in votes:
+            if 0 <= id < len(elements):
+                elements[id][field] += 1
+        _replace_story_file(path, elements, [token, len(content)])
+        # New votes wait on our lock, then notice the swap and append to the new log
+        tmp = log_path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(f'#{uuid.uuid4().hex}\n'.encode())
+        os.replace(tmp, log_path)
+
+def flush_votes():
+    """Checkpoint every story file with votes logged since the last flush"""
+    global _vote_timer
+    with _vote_lock:
+        if _vote_timer is not None:
+            _vote_timer.cancel()
+            _vote_timer = None
+        for path in list(_pending_votes):
+            try:
+                _checkpoint_votes(path)
+            except Exception as e:
+                # The votes stay in the log and go out with the next checkpoint
+                print(f'❌ Failed to flush story votes to {path}: {e}')
+                continue
+            del _pending_votes[path]
+
+# Don't leave the last votes only in the log when the process exits
+atexit.register(flush_votes)
 
 def addStoryLove(id):
-    """Increment the love count for a story element"""
+    """Increment the love count for a story element and return the element"""
     return _vote_story(id, 'love')
 
 def addStorySkip(id):
-    """Increment the skip count for a story element"""
+    """Increment the skip count for a story element and return the element"""
     return _vote_story(id, 'skip')
 
 # ============================================================================
@@ -30,7 +30,7 @@ from api.microblog_api import microblog_api
 from api.classroom_api import classroom_api
 from hacks.joke import joke_api  # Import the joke API blueprint
 from api.post import post_api  # Import the social media post API
-from api.rpg_api import rpg_api, init_rpg_stats  # Import the RPG game API and stats initializer
+from api.rpg_api import rpg_api  # Import the RPG game API (its databases are initialized on registration)
 #from api.announcement import announcement_api ##temporary revert
 
 # database Initialization functions
@@ -93,7 +93,6 @@ with app.app_context():
     initJokes()
     initStoryElements()  # Initialize story elements
     initRPGUsers()  # Initialize RPG users table
-    init_rpg_stats()
     CharacterSheet.metadata.create_all(bind=db.get_engine(bind='rpg'))
     Quest.metadata.create_all(bind=db.get_engine(bind='rpg'))
 # Tell Flask-Login the view function name of your login route
@@ -375,6 +374,6 @@ if __name__ == "__main__":
     host = "0.0.0.0"
     port = app.config['FLASK_PORT']
     print(f"** Server running: http://localhost:{port}")  # Pretty link
-    app.run(debug=True, host="0.0.0.0", port="8304", use_reloader=False)
+    app.run(debug=app.config['FLASK_DEBUG'], host="0.0.0.0", port="8304", use_reloader=False)
 
   
@@ -3,6 +3,17 @@ from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask import current_app
 
+# Checked against when a GitHub ID doesn't exist, so a failed login costs the
+# same hash verification either way and response time doesn't reveal which IDs exist
+_missing_user_hash = None
+
+def _dummy_password_check(password):
+    global _missing_user_hash
+    if _missing_user_hash is None:
+        _missing_user_hash = generate_password_hash("rpg-missing-user")
+    check_password_hash(_missing_user_hash, password)
+
+
 class RPGUser(db.Model):
     """
     RPG User Model
@@ -115,13 +126,13 @@ class RPGUser(db.Model):
         Returns:
             RPGUser object if found and password matches, None otherwise
         """
-        user = RPGUser.query.filter_by(
-            _first_name=first_name,
-            _last_name=last_name,
-            _github_id=github_id
-        ).first()
+        # GitHub ID is unique (and indexed), so look it up alone and check the names here
+        user = RPGUser.find_by_github_id(github_id)
         
-        if user and user.is_password(password):
+        if user is None or user._first_name != first_name or user._last_name != last_name:
+            _dummy_password_check(password)
+            return None
+        if user.is_password(password):
             return user
         return None
     
@@ -152,7 +163,10 @@ class RPGUser(db.Model):
         """
         user = RPGUser.query.filter_by(_github_id=github_id).first()
         
-        if user and user.is_password(password):
+        if user is None:
+            _dummy_password_check(password)
+            return None
+        if user.is_password(password):
             return user
         return None
 
@@ -174,10 +188,12 @@ def initRPGUsers():
             RPGUser(first_name="Jane", last_name="Smith", github_id="janesmith", password="password456")
         ]
         
-        for user in default_users:
-            try:
-                user.create()
+        # One transaction (and one commit) for all default users
+        try:
+            db.session.add_all(default_users)
+            db.session.commit()
+            for user in default_users:
                 print(f"RPG User created: {user.first_name} {user.last_name}")
-            except Exception as e:
-                print(f"Error creating RPG user: {e}")
-                db.session.rollback()
+        except Exception as e:
+            print(f"Error creating RPG users: {e}")
+            db.session.rollback()